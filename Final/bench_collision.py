@@ -0,0 +1,70 @@
+import math
+import random
+import time
+from particle import collide, rotate
+
+# Mikro-Benchmark für die Stoßantwort: die frühere Variante mit atan2 und
+# rotate() gegen collide() mit Projektionen. Aufruf: python bench_collision.py
+
+def collide_rotate(x1, y1, vx1, vy1, m1, x2, y2, vx2, vy2, m2):
+    # Ursprüngliche Formel aus Particle.update als Referenz, mit derselben
+    # Bedingung wie collide (kein Stoß ohne Annäherung)
+    res = [vx1 - vx2, vy1 - vy2]
+    if res[0] * (x2 - x1) + res[1] * (y2 - y1) <= 0:
+        return None
+
+    theta = -math.atan2(y2 - y1, x2 - x1)
+    u1 = rotate([vx1, vy1], theta)
+    u2 = rotate([vx2, vy2], theta)
+    v1 = rotate([u1[0] * (m1 - m2) / (m1 + m2) + u2[0] * 2 * m2 / (m1 + m2), u1[1]], -theta)
+    v2 = rotate([u2[0] * (m2 - m1) / (m1 + m2) + u1[0] * 2 * m1 / (m1 + m2), u2[1]], -theta)
+    return v1[0], v1[1], v2[0], v2[1]
+
+def make_contacts(count, seed=0):
+    rng = random.Random(seed)
+    contacts = []
+    for _ in range(count):
+        angle = rng.uniform(0, 2 * math.pi)
+        distance = rng.uniform(5, 40)
+        x1, y1 = rng.uniform(0, 800), rng.uniform(0, 600)
+        contacts.append((
+            x1, y1, rng.uniform(-10, 10), rng.uniform(-10, 10), rng.uniform(0.5, 2),
+            x1 + distance * math.cos(angle), y1 + distance * math.sin(angle),
+            rng.uniform(-10, 10), rng.uniform(-10, 10), rng.uniform(0.5, 2),
+        ))
+    return contacts
+
+def max_difference(contacts):
+    worst = 0.0
+    for contact in contacts:
+        old = collide_rotate(*contact)
+        new = collide(*contact)
+        if (old is None) != (new is None):
+            return math.inf
+        if old is not None:
+            worst = max(worst, max(abs(a - b) for a, b in zip(old, new)))
+    return worst
+
+def contacts_per_second(function, contacts, repeat=5):
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for contact in contacts:
+            function(*contact)
+        best = min(best, time.perf_counter() - start)
+    return len(contacts) / best
+
+def main():
+    contacts = make_contacts(100000)
+    difference = max_difference(contacts)
+    before = contacts_per_second(collide_rotate, contacts)
+    after = contacts_per_second(collide, contacts)
+
+    print("Kontakte:              %d" % len(contacts))
+    print("max. Abweichung:       %.3e" % difference)
+    print("rotate (vorher):       %.0f Kontakte/s" % before)
+    print("Projektion (nachher):  %.0f Kontakte/s" % after)
+    print("Beschleunigung:        %.2fx" % (after / before))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import math
+import random
+import sys
+import time
+import numpy as np
+from kernel import compiled, resolve_contacts
+from placement import scatter
+from system import ParticleSystem
+
+# Vergleich der Stoßschleife in ParticleSystem.collide: Python-Schleife
+# (Referenz) gegen resolve_contacts aus kernel.py, übersetzt mit numba, falls
+# installiert. Ohne numba läuft resolve_contacts interpretiert; das ist
+# langsam, prüft aber, dass die Rechnung bitgleich zur Referenz ist.
+#   python bench_kernel.py --balls 5000 --steps 200
+
+def make_system(count, seed, kernel):
+    # Dichte wie beim Benchmark (100 Kugeln auf 800x600), ohne Überlappung
+    scale = math.sqrt(count / 100)
+    width, height = int(800 * scale), int(600 * scale)
+    system = ParticleSystem(scatter(width, height, count, random.Random(seed)))
+    system.kernel = kernel
+    return system, width, height
+
+def run(count, seed, steps, kernel):
+    system, width, height = make_system(count, seed, kernel)
+    # Der Kernel ist schon übersetzt, ParticleSystem ruft beim Anlegen kernel.warm auf
+    start = time.perf_counter()
+    for _ in range(steps):
+        system.step(width, height, 1.0)
+    elapsed = time.perf_counter() - start
+    state = np.column_stack((system.x, system.y, system.vx, system.vy))
+    return state, system.contacts, elapsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark und Gleichheitsprüfung der Stoßschleife")
+    parser.add_argument("--balls", type=int, default=2000, help="Anzahl der Kugeln")
+    parser.add_argument("--steps", type=int, default=100, help="Gemessene Schritte")
+    parser.add_argument("--seed", type=int, default=0, help="Startwert für die Aufstellung")
+    args = parser.parse_args(argv)
+
+    kernels = [("Python", None), ("interpretiert" if compiled is None else "numba", compiled or resolve_contacts)]
+    results = [run(args.balls, args.seed, args.steps, kernel) for _, kernel in kernels]
+
+    reference = results[0]
+    failed = False
+    for (name, _), (state, contacts, elapsed) in zip(kernels, results):
+        difference = float(np.abs(state - reference[0]).max())
+        failed |= difference != 0 or contacts != reference[1]
+        print("%-14s %8.1f Schritte/s  %8d Stöße  Abweichung %g  %.2fx" % (
+            name, args.steps / elapsed, contacts, difference, reference[2] / elapsed))
+    if compiled is None:
+        print("numba ist nicht installiert, ParticleSystem nutzt die Python-Schleife")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
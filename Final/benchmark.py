@@ -0,0 +1,200 @@
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import numpy as np
+from broadphase import SpatialGrid, SweepAndPrune
+from eventdriven import EventSimulation
+from headless import DEFAULTS, PARAMETERS
+from scenarios import build_rack, build_random, shoot
+from system import ParticleSystem
+from kernel import warm
+
+# Benchmark der Physik ohne Fenster. Szenarien:
+#   rack     Anstoß auf das Dreieck aus main.py
+#   moving   N zufällige Kugeln wie in main4.py, alle in Bewegung
+#   resting  dieselbe Aufstellung, nur 1 % der Kugeln bewegt sich
+# Der Tisch wächst mit N, damit die Dichte wie bei 100 Kugeln auf 800x600 bleibt.
+# rack läuft bis zur Ruhe, die anderen Szenarien eine feste Schrittzahl, damit
+# Messungen verschiedener Versionen dieselbe Arbeit vergleichen.
+#
+#   python benchmark.py --output bench.json
+#   python benchmark.py --sizes 100 1000 --compare bench.json
+#   python benchmark.py --engines system particle --broadphases grid sap
+#   python benchmark.py --game --broadphases grid sap
+#
+# Ohne --game läuft ParticleSystem mit seinen Voreinstellungen (keine
+# Teilschritte, kein ccd, kein Trennen), mit --game wie im Spiel und in
+# headless.py.
+
+SIZES = (100, 500, 1000, 5000, 10000, 20000)
+ENGINES = ("system", "particle", "event")
+BROADPHASES = ("grid", "sap")
+GAME = {name: PARAMETERS[name] for name in ("max_travel", "ccd", "separation")}
+
+class ParticleLoop:
+    # Schrittschleife wie vor dem ParticleSystem: Particle.update pro Kugel
+    def __init__(self, particles, broadphase="grid"):
+        self.particles = particles
+        self.grid = SweepAndPrune() if broadphase == "sap" else SpatialGrid()
+
+    def step(self, canvas_width, canvas_height, damping_factor):
+        self.grid.build(self.particles)
+        for i, particle in enumerate(self.particles):
+            particle.update(canvas_width, canvas_height, self.particles, i, damping_factor, self.grid)
+
+def rack_scenario(seed):
+    width, height = DEFAULTS["rack"]["width"], DEFAULTS["rack"]["height"]
+    particles = build_rack(width, height, 28.6 / 2, 170, True, random.Random(seed))
+    shoot(particles[-1], 8, 90)
+    return particles, width, height
+
+def random_scenario(count, moving, seed):
+    scale = math.sqrt(count / 100)
+    width, height = int(800 * scale), int(600 * scale)
+    rng = random.Random(seed)
+    particles = build_random(width, height, count, rng)
+    for particle in particles:
+        if rng.random() >= moving:
+            particle.vx = particle.vy = 0
+    return particles, width, height
+
+def make_engine(name, particles, broadphase, game=False):
+    if name == "particle":
+        return ParticleLoop(particles, broadphase), None
+    system = ParticleSystem(particles, broadphase=broadphase, **(GAME if game else {}))
+    if name == "event":
+        return EventSimulation(system), system
+    return system, system
+
+def measure(scenario, engine_name, broadphase, particles, width, height, damping, warmup, max_steps, until_rest=False, game=False):
+    count = len(particles)
+    # Speicher der Simulationsdaten, einschließlich der Particle-Objekte
+    tracemalloc.start()
+    engine, system = make_engine(engine_name, [copy_particle(p) for p in particles], broadphase, game)
+    memory = tracemalloc.get_traced_memory()[0] / count
+    tracemalloc.stop()
+
+    for _ in range(warmup):
+        engine.step(width, height, damping)
+
+    contacts_before = system.contacts if system else 0
+    events_before = engine.events if engine_name == "event" else 0
+    steps = 0
+    start = time.perf_counter()
+    while steps < max_steps and not (until_rest and system.at_rest):
+        engine.step(width, height, damping)
+        steps += 1
+    elapsed = time.perf_counter() - start
+
+    if engine_name == "event":
+        contacts = engine.events - events_before
+    elif system:
+        contacts = system.contacts - contacts_before
+    else:
+        contacts = None
+
+    return {
+        "scenario": scenario,
+        "engine": engine_name,
+        "broadphase": broadphase,
+        "game": game,
+        "balls": count,
+        "steps": steps,
+        "seconds": elapsed,
+        "steps_per_second": steps / elapsed,
+        "collisions_per_second": contacts / elapsed if contacts is not None else None,
+        "bytes_per_ball": memory,
+    }
+
+def variants(engines, broadphases):
+    # Die ereignisgesteuerte Simulation hat keine Kandidatensuche
+    for engine in engines:
+        for broadphase in (broadphases if engine != "event" else broadphases[:1]):
+            yield engine, broadphase
+
+def run_suite(sizes, engines, steps, seed, max_legacy, broadphases=("grid",), game=False):
+    results = []
+    # numba vorab übersetzen, sonst zahlt die erste gemessene Variante dafür
+    # (und die Übersetzung landet in der Speichermessung)
+    warm()
+    particles, width, height = rack_scenario(seed)
+    for engine, broadphase in variants(engines, broadphases):
+        # Die alte Schleife kennt keinen Ruhezustand und läuft bis zum Limit
+        results.append(measure("rack", engine, broadphase, particles, width, height, 0.995, 0, 5000, engine != "particle", game))
+        print_result(results[-1])
+
+    for count in sizes:
+        for scenario, moving, warmup in (("moving", 1.0, 5), ("resting", 0.01, 40)):
+            particles, width, height = random_scenario(count, moving, seed)
+            for engine, broadphase in variants(engines, broadphases):
+                if engine != "system" and count > max_legacy:
+                    continue
+                results.append(measure(scenario, engine, broadphase, particles, width, height, 1.0, warmup, steps, game=game))
+                print_result(results[-1])
+    return results
+
+def copy_particle(particle):
+    return type(particle)(particle.x, particle.y, particle.r, particle.vx, particle.vy, particle.mass)
+
+def print_result(result):
+    collisions = result["collisions_per_second"]
+    print("%-8s %-9s %-5s %6d Kugeln  %9.1f Schritte/s  %10s Stöße/s  %6.0f B/Kugel" % (
+        result["scenario"], result["engine"], result["broadphase"], result["balls"], result["steps_per_second"],
+        "%.0f" % collisions if collisions is not None else "-", result["bytes_per_ball"]), file=sys.stderr)
+
+def compare(results, path, tolerance):
+    # Ergebnisse mit einer früheren Datei vergleichen; Rückgabe: Anzahl der
+    # Messungen, die um mehr als tolerance langsamer geworden sind
+    with open(path) as f:
+        # Ältere Dateien kennen nur das Gitter und die Voreinstellungen
+        previous = {(r["scenario"], r["engine"], r.get("broadphase", "grid"), r.get("game", False), r["balls"]): r for r in json.load(f)["results"]}
+
+    regressions = 0
+    for result in results:
+        old = previous.get((result["scenario"], result["engine"], result["broadphase"], result["game"], result["balls"]))
+        if old is None:
+            continue
+        ratio = result["steps_per_second"] / old["steps_per_second"]
+        slower = ratio < 1 - tolerance
+        regressions += slower
+        print("%-8s %-9s %-5s %6d Kugeln  %5.2fx%s" % (
+            result["scenario"], result["engine"], result["broadphase"], result["balls"], ratio, "  LANGSAMER" if slower else ""), file=sys.stderr)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark der Billard-Physik")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="Kugelanzahlen für moving/resting")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=("system",), help="Zu messende Schrittverfahren")
+    parser.add_argument("--broadphases", nargs="+", choices=BROADPHASES, default=("grid",), help="Zu vergleichende Kandidatensuchen (system und particle)")
+    parser.add_argument("--game", action="store_true", help="ParticleSystem mit Teilschritten, ccd und Trennen wie im Spiel")
+    parser.add_argument("--steps", type=int, default=100, help="Gemessene Schritte pro moving/resting-Szenario")
+    parser.add_argument("--seed", type=int, default=0, help="Startwert für die Aufstellungen")
+    parser.add_argument("--max-legacy", type=int, default=2000, help="particle/event nur bis zu dieser Kugelanzahl messen")
+    parser.add_argument("--output", help="Ergebnisse als JSON in diese Datei schreiben")
+    parser.add_argument("--compare", help="Mit früheren Ergebnissen (JSON) vergleichen")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Erlaubter Verlust an Schritten/s beim Vergleich")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.sizes, args.engines, args.steps, args.seed, args.max_legacy, args.broadphases, args.game)
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import math
+import numpy as np
+
+class SpatialGrid:
+    # Gleichförmiges Gitter: jede Kugel landet in genau einer Zelle. Ist die
+    # Zellgröße mindestens der größte Durchmesser, können sich nur Kugeln in
+    # benachbarten Zellen (3x3) berühren.
+    def __init__(self, cell_size=None):
+        self.cell_size = cell_size
+        self.size = cell_size
+        self.cells = {}
+        self.keys = []
+
+    def cell(self, x, y):
+        return (math.floor(x / self.size), math.floor(y / self.size))
+
+    def build(self, particles):
+        self.cells = {}
+        self.keys = []
+        if not particles:
+            return
+
+        # Ohne feste Zellgröße richtet sich das Gitter nach dem größten Radius
+        self.size = self.cell_size or 2 * max(p.r for p in particles)
+
+        for i, particle in enumerate(particles):
+            key = self.cell(particle.x, particle.y)
+            self.keys.append(key)
+            self.cells.setdefault(key, []).append(i)
+
+    def candidates(self, index):
+        # Alle Kugeln mit größerem Index aus den Nachbarzellen, aufsteigend
+        # sortiert wie in der Brute-Force-Schleife
+        cx, cy = self.keys[index]
+        result = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for j in self.cells.get((cx + dx, cy + dy), ()):
+                    if j > index:
+                        result.append(j)
+        result.sort()
+        return result
+
+# Halbe Nachbarschaft: jede Zellpaarung wird genau einmal besucht
+NEIGHBOUR_OFFSETS = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+def grid_pairs(x, y, r, cell_size=None):
+    # Vektorisierte Variante des Gitters für Positions-Arrays. Liefert die
+    # Kandidatenpaare als zwei Index-Arrays mit first < second.
+    n = len(x)
+    if n < 2:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+    size = cell_size or 2 * r.max()
+    cx = np.floor(x / size).astype(np.int64)
+    cy = np.floor(y / size).astype(np.int64)
+    # Rand von einer Zelle lassen, damit Nachbarschlüssel nicht überlaufen
+    cx -= cx.min() - 1
+    cy -= cy.min() - 1
+    stride = cy.max() + 2
+    keys = cx * stride + cy
+
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    cells, starts, counts = np.unique(sorted_keys, return_index=True, return_counts=True)
+    index = np.arange(n)
+
+    first = []
+    second = []
+    for dx, dy in NEIGHBOUR_OFFSETS:
+        target = sorted_keys + dx * stride + dy
+        pos = np.minimum(np.searchsorted(cells, target), len(cells) - 1)
+        found = np.where(cells[pos] == target, counts[pos], 0)
+
+        a = np.repeat(index, found)
+        within = np.arange(len(a)) - np.repeat(np.cumsum(found) - found, found)
+        b = np.repeat(starts[pos], found) + within
+        if (dx, dy) == (0, 0):
+            keep = b > a
+            a = a[keep]
+            b = b[keep]
+
+        first.append(order[a])
+        second.append(order[b])
+
+    first = np.concatenate(first)
+    second = np.concatenate(second)
+    return np.minimum(first, second), np.maximum(first, second)
+
+def all_pairs(n):
+    # Brute-Force: alle Paare i < j
+    return np.triu_indices(n, 1)
+
+class SweepAndPrune:
+    # Alle Kugeln nach linkem Rand (x - r) sortiert; zwei Kugeln können sich
+    # nur berühren, wenn sich ihre x-Intervalle überlappen. Die Reihenfolge
+    # bleibt von Schritt zu Schritt erhalten und wird nur nachsortiert, da
+    # sich die Kugeln pro Schritt kaum gegeneinander verschieben. Das passt
+    # auch zu sehr ungleichmäßigen Aufstellungen (dichtes Dreieck, einzelne
+    # schnelle Kugeln), bei denen ein Gitter viele leere Zellen hat.
+    def __init__(self):
+        self.order = []
+        self.partners = {}
+
+    def build(self, particles):
+        # Für Particle.update: Insertion Sort der letzten Reihenfolge, dann
+        # ein Durchlauf, der für jede Kugel die Partner mit größerem Index
+        # sammelt. Die Intervalle wachsen um die Geschwindigkeit, weil sich
+        # die Kugeln während der Schleife in Particle.update noch bewegen.
+        if len(self.order) != len(particles):
+            self.order = list(range(len(particles)))
+        lo = [p.x - p.r - abs(p.vx) for p in particles]
+        hi = [p.x + p.r + abs(p.vx) for p in particles]
+        order = self.order
+        for k in range(1, len(order)):
+            item = order[k]
+            key = lo[item]
+            m = k - 1
+            while m >= 0 and lo[order[m]] > key:
+                order[m + 1] = order[m]
+                m -= 1
+            order[m + 1] = item
+
+        self.partners = {}
+        for k, i in enumerate(order):
+            a = particles[i]
+            reach_y = a.r + abs(a.vy)
+            for j in order[k + 1:]:
+                if lo[j] >= hi[i]:
+                    break
+                b = particles[j]
+                if abs(a.y - b.y) < reach_y + b.r + abs(b.vy):
+                    self.partners.setdefault(min(i, j), []).append(max(i, j))
+        for others in self.partners.values():
+            others.sort()
+
+    def candidates(self, index):
+        # Wie SpatialGrid.candidates: Partner mit größerem Index, aufsteigend
+        return self.partners.get(index, [])
+
+    def pairs(self, x, y, r):
+        # Vektorisierte Variante für ParticleSystem. Statt Insertion Sort
+        # sortiert argsort(kind="stable") die letzte Reihenfolge nach; das ist
+        # Timsort und auf fast sortierten Daten nahezu linear.
+        n = len(x)
+        if n < 2:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        if len(self.order) != n:
+            self.order = np.arange(n)
+        order = np.asarray(self.order)
+        lo = (x - r)[order]
+        resort = np.argsort(lo, kind="stable")
+        order = self.order = order[resort]
+        lo = lo[resort]
+        hi = (x + r)[order]
+
+        # Partner in der Sortierung: alle folgenden Kugeln, deren linker Rand
+        # vor dem rechten Rand dieser Kugel liegt
+        end = np.searchsorted(lo, hi, side="left")
+        count = np.maximum(end - np.arange(n) - 1, 0)
+        a = np.repeat(np.arange(n), count)
+        b = a + 1 + np.arange(len(a)) - np.repeat(np.cumsum(count) - count, count)
+
+        first = order[a]
+        second = order[b]
+        # Zweite Achse: auch die y-Intervalle müssen sich überlappen
+        keep = np.abs(y[first] - y[second]) < r[first] + r[second]
+        first = first[keep]
+        second = second[keep]
+        return np.minimum(first, second), np.maximum(first, second)
@@ -0,0 +1,138 @@
+import heapq
+import math
+import numpy as np
+from particle import collide
+
+# Ereignisgesteuerte Simulation: statt x += vx pro Schritt werden die
+# Zeitpunkte der nächsten Stöße (Kugel-Kugel, Kugel-Bande) vorausberechnet
+# und in einer Prioritätswarteschlange abgelegt. Die Simulation springt von
+# Ereignis zu Ereignis, Kugeln können sich dadurch nicht durchdringen.
+#
+# Die Zeit zählt in Frames wie bei ParticleSystem.step (dt = 1 ist ein Frame).
+# Die Dämpfung wird am Ende jedes Schritts angewandt; ist sie ungleich 1,
+# werden danach alle Vorhersagen neu berechnet.
+#
+# Banden kommen aus system.table (siehe table.py); ein Ereignis mit Strecke k
+# trägt als zweiten Index -1 - k.
+
+class EventSimulation:
+    def __init__(self, system):
+        self.system = system
+        self.time = 0.0
+        self.queue = []
+        self.counts = np.zeros(len(system), dtype=np.int64)
+        self.sequence = 0
+        self.events = 0
+        self.table = None
+        self.dirty = True
+
+    def invalidate(self):
+        # Nach Änderungen von außen (z.B. Anstoß der weißen Kugel) aufrufen
+        self.dirty = True
+
+    def push(self, time, i, j):
+        count_j = self.counts[j] if j >= 0 else 0
+        heapq.heappush(self.queue, (time, self.sequence, i, j, self.counts[i], count_j))
+        self.sequence += 1
+
+    def predict(self, i, limit):
+        s = self.system
+        vx, vy = s.vx[i], s.vy[i]
+
+        # Kugel-Kugel: kleinste Lösung von |dr + dv t| = r_i + r_j
+        dx = s.x - s.x[i]
+        dy = s.y - s.y[i]
+        dvx = s.vx - vx
+        dvy = s.vy - vy
+        dvdr = dx * dvx + dy * dvy
+        dvdv = dvx * dvx + dvy * dvy
+        drdr = dx * dx + dy * dy
+        sigma = s.r + s.r[i]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d = dvdr * dvdr - dvdv * (drdr - sigma * sigma)
+            t = -(dvdr + np.sqrt(d)) / dvdv
+        # Bereits überlappende, sich annähernde Kugeln stoßen sofort
+        t = np.where(drdr < sigma * sigma, 0.0, t)
+        hit = (dvdr < 0) & (d >= 0) & (dvdv > 0) & (self.time + t <= limit)
+        hit[i] = False
+        for j in np.flatnonzero(hit).tolist():
+            self.push(self.time + max(float(t[j]), 0.0), i, j)
+
+        # Banden
+        t = self.table.impact_times(s.x[i], s.y[i], vx, vy, s.r[i])
+        for k in np.flatnonzero(self.time + t <= limit).tolist():
+            self.push(self.time + max(float(t[k]), 0.0), i, -1 - k)
+
+    def predict_all(self, limit):
+        self.queue = []
+        s = self.system
+        for i in np.flatnonzero((s.vx != 0) | (s.vy != 0)).tolist():
+            self.predict(i, limit)
+
+    def move(self, time):
+        dt = time - self.time
+        if dt > 0:
+            s = self.system
+            s.x += s.vx * dt
+            s.y += s.vy * dt
+        self.time = time
+
+    def resolve(self, i, j):
+        s = self.system
+        if j < 0:
+            return self.table.bounce(s.x, s.y, s.vx, s.vy, s.r, i, -1 - j)
+        else:
+            result = collide(s.x[i], s.y[i], s.vx[i], s.vy[i], s.mass[i],
+                             s.x[j], s.y[j], s.vx[j], s.vy[j], s.mass[j])
+            if result is None:
+                return False
+            s.vx[i], s.vy[i], s.vx[j], s.vy[j] = result
+        return True
+
+    def advance(self, dt, limit=math.inf):
+        # Alle Ereignisse bis self.time + dt abarbeiten, dann dorthin ziehen
+        target = self.time + dt
+        if self.dirty:
+            self.counts = np.zeros(len(self.system), dtype=np.int64)
+            self.predict_all(limit)
+            self.dirty = False
+
+        while self.queue and self.queue[0][0] <= target:
+            time, _, i, j, count_i, count_j = heapq.heappop(self.queue)
+            if self.counts[i] != count_i or (j >= 0 and self.counts[j] != count_j):
+                continue
+
+            self.move(time)
+            if not self.resolve(i, j):
+                continue
+            self.events += 1
+
+            self.counts[i] += 1
+            self.predict(i, limit)
+            if j >= 0:
+                self.counts[j] += 1
+                self.predict(j, limit)
+
+        self.move(target)
+
+    def step(self, canvas_width, canvas_height, damping_factor, dt=1.0):
+        # Gleiche Signatur wie ParticleSystem.step: dt Frames weiter
+        table = self.system.boundary(canvas_width, canvas_height)
+        if self.table is not table:
+            self.table = table
+            self.dirty = True
+
+        self.system.wake()
+        if damping_factor == 1:
+            self.advance(dt)
+        else:
+            self.dirty = True
+            self.advance(dt, self.time + dt)
+            self.system.vx *= damping_factor ** dt
+            self.system.vy *= damping_factor ** dt
+
+        # Eingelochte oder eingeschlafene Kugeln: Vorhersagen sind veraltet
+        if self.system.capture():
+            self.dirty = True
+        if self.system.settle(dt):
+            self.dirty = True
@@ -0,0 +1,216 @@
+import argparse
+import json
+import random
+import sys
+import time
+import numpy as np
+from scenarios import build_rack, build_random, shoot, table_pockets, respawn_cue
+from placement import RACKS, scatter
+from system import ParticleSystem, FRAME_RATE
+from table import Table
+from eventdriven import EventSimulation
+from recording import Recorder
+from trajectory import TrajectoryWriter
+from profiler import Capture, capture_path
+
+# Simulation ohne Fenster für Rechner ohne Anzeige. pygame wird hier nie
+# importiert. Beispiel:
+#   python headless.py --scenario rack --zoom 2 --speed 8 --angle 90 --frames 600
+#   python headless.py --config lauf.json --output ergebnis.json
+#   python headless.py --seed 42 --record lauf.bin
+#   python headless.py --scenario random --balls 5000 --trajectory bahn.trj
+#   python headless.py --scenario 9ball --pockets --speed 12
+
+DEFAULTS = {
+    "rack": {"width": int(1270 / 3), "height": int(2540 / 3), "damping": 1.0},
+    "8ball": {"width": int(1270 / 3), "height": int(2540 / 3), "damping": 1.0},
+    "9ball": {"width": int(1270 / 3), "height": int(2540 / 3), "damping": 1.0},
+    "snooker": {"width": int(1270 / 3), "height": int(2540 / 3), "damping": 1.0},
+    "random": {"width": 800, "height": 600, "damping": 0.995},
+    "scatter": {"width": 800, "height": 600, "damping": 0.995},
+}
+
+# Objektkugeln der festen Aufstellungen; die weiße Kugel folgt als letzte
+RACK_SIZES = {"rack": 15, "8ball": 15, "9ball": 9, "snooker": 21}
+
+PARAMETERS = {
+    "scenario": "rack",
+    "zoom": 2.0,
+    "random_offset": False,
+    "balls": 100,
+    "speed": 8.0,
+    "angle": 90.0,
+    "frames": 600,
+    "grid": True,
+    "broadphase": None,
+    "max_travel": 0.5,
+    "ccd": True,
+    "separation": 4,
+    "engine": "fixed",
+    "rate": FRAME_RATE,
+    "pockets": False,
+    "pocket_radius": 30.0,
+    "seed": None,
+}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Billard-Simulation ohne Anzeige")
+    parser.add_argument("--config", help="JSON-Datei mit Parametern (Kommandozeile hat Vorrang)")
+    parser.add_argument("--scenario", choices=sorted(DEFAULTS), help="rack (wie main.py), 8ball, 9ball, snooker, random (wie main4.py) oder scatter (random ohne Überlappung)")
+    parser.add_argument("--zoom", type=float, help="Zoom wie im Fenster, Radius = 28.6 / Zoom")
+    parser.add_argument("--random-offset", dest="random_offset", action="store_true", default=None, help="Zufälligen Versatz im Dreieck verwenden")
+    parser.add_argument("--balls", type=int, help="Anzahl der Kugeln (nur random und scatter)")
+    parser.add_argument("--damping", type=float, help="Dämpfungsfaktor pro Schritt (0-1)")
+    parser.add_argument("--speed", type=float, help="Geschwindigkeit der weißen Kugel")
+    parser.add_argument("--angle", type=float, help="Winkel der weißen Kugel in Grad")
+    parser.add_argument("--width", type=int, help="Tischbreite in Pixeln")
+    parser.add_argument("--height", type=int, help="Tischhöhe in Pixeln")
+    parser.add_argument("--frames", type=int, help="Höchstzahl der Physikschritte, vorher Ende sobald alle Kugeln ruhen")
+    parser.add_argument("--rate", type=float, help="Physikschritte pro Sekunde Spielzeit (Standard 60, z.B. 240 für genauere Stöße)")
+    parser.add_argument("--engine", choices=("fixed", "event"), help="fixed: fester Schritt, event: ereignisgesteuert")
+    parser.add_argument("--pockets", action="store_true", default=None, help="Sechs Taschen; eingelochte Kugeln verschwinden, die weiße wird neu aufgestellt")
+    parser.add_argument("--pocket-radius", dest="pocket_radius", type=float, help="Fangradius der Taschen in Pixeln")
+    parser.add_argument("--brute-force", dest="grid", action="store_false", default=None, help="Alle Paare prüfen statt Gitter")
+    parser.add_argument("--broadphase", choices=("grid", "sap", "brute"), help="Kandidatensuche: Gitter, Sweep and Prune oder alle Paare (Standard: grid)")
+    parser.add_argument("--max-travel", dest="max_travel", type=float, help="Schritt unterteilen, sobald eine Kugel weiter als dieser Anteil des kleinsten Radius kommt (0: nie)")
+    parser.add_argument("--no-ccd", dest="ccd", action="store_false", default=None, help="Keine Suche nach Stößen innerhalb eines Schritts (Swept Circles)")
+    parser.add_argument("--separation", type=int, help="Durchgänge, um überlappende Kugeln auseinanderzuschieben (0: aus)")
+    parser.add_argument("--seed", type=int, help="Startwert für den Zufall (Standard: zufällig, steht im Ergebnis)")
+    parser.add_argument("--record", help="Lauf als Binärprotokoll in diese Datei schreiben")
+    parser.add_argument("--trajectory", help="Trajektorie (float32, siehe trajectory.py) in diese Datei schreiben")
+    parser.add_argument("--profile", type=int, metavar="FRAMES", help="Die ersten FRAMES Schritte mit cProfile aufzeichnen, Zusammenfassung auf stderr")
+    parser.add_argument("--profile-file", dest="profile_file", help="Datei für die Aufzeichnung (Standard: profile-<Datum>-<Zeit>.prof)")
+    parser.add_argument("--output", help="Ergebnis als JSON in diese Datei statt auf stdout")
+    return parser.parse_args(argv)
+
+def load_parameters(args):
+    parameters = dict(PARAMETERS)
+    if args.config:
+        with open(args.config) as f:
+            parameters.update(json.load(f))
+
+    for name, value in vars(args).items():
+        if value is not None and name not in ("config", "output", "record", "trajectory", "profile", "profile_file"):
+            parameters[name] = value
+
+    for name, value in DEFAULTS[parameters["scenario"]].items():
+        parameters.setdefault(name, value)
+
+    # Auch ohne vorgegebenen Seed soll jeder Lauf wiederholbar sein
+    if parameters["seed"] is None:
+        parameters["seed"] = random.randrange(2 ** 32)
+    return parameters
+
+def build_system(parameters):
+    # Startaufstellung ohne Anstoß; gleiche Parameter und gleicher Seed
+    # ergeben immer dieselbe Aufstellung
+    rng = random.Random(parameters["seed"])
+    width, height = parameters["width"], parameters["height"]
+    radius = 28.6 / parameters["zoom"]
+    if parameters["scenario"] == "rack":
+        particles = build_rack(width, height, radius, 170, parameters["random_offset"], rng)
+    elif parameters["scenario"] in RACKS:
+        jitter = 1.0 if parameters["random_offset"] else 0
+        particles = RACKS[parameters["scenario"]](width, height, radius, 170, rng, jitter)
+    elif parameters["scenario"] == "scatter":
+        particles = scatter(width, height, parameters["balls"], rng)
+    else:
+        particles = build_random(width, height, parameters["balls"], rng)
+
+    # Ältere Protokolle kennen weder Teilschritte, ccd noch das Trennen und bleiben ohne
+    system = ParticleSystem(particles, parameters["grid"], broadphase=parameters.get("broadphase"),
+                            max_travel=parameters.get("max_travel"), ccd=parameters.get("ccd", False),
+                            separation=parameters.get("separation", 0))
+    # Ältere Protokolle und Konfigurationen kennen noch keine Taschen
+    if parameters.get("pockets"):
+        pockets = table_pockets(width, height, parameters["pocket_radius"])
+        system.pockets = np.array(pockets, dtype=np.float64)
+        system.pocket_radius = parameters["pocket_radius"]
+        system.table = Table.with_pockets(width, height, pockets, parameters["pocket_radius"])
+        cue = particles[-1]
+        respawn_cue(system, cue_id(parameters), cue.x, cue.y, cue.r, cue.mass)
+    return system
+
+def cue_id(parameters):
+    # Die weiße Kugel wird in allen Szenarien als letzte aufgestellt
+    if parameters["scenario"] in RACK_SIZES:
+        return RACK_SIZES[parameters["scenario"]]
+    return parameters["balls"]
+
+def run(parameters, record=None, trajectory=None, capture=None):
+    system = build_system(parameters)
+    shoot(system.find(cue_id(parameters)), parameters["speed"], parameters["angle"])
+    recorder = Recorder(record, parameters, system) if record else None
+    if recorder:
+        recorder.shot(system.frame, parameters["speed"], parameters["angle"])
+    writer = TrajectoryWriter(trajectory, len(system), parameters) if trajectory else None
+
+    start_x = system.x.copy()
+    start_y = system.y.copy()
+    pocketed = []
+    system.pocket_listeners.append(lambda ball, pocket, frame: pocketed.append({"ball": ball, "pocket": pocket, "frame": frame}))
+
+    engine = EventSimulation(system) if parameters["engine"] == "event" else system
+    dt = FRAME_RATE / parameters["rate"]
+
+    # Sobald alle Kugeln ruhen, ist der Stoß vorbei
+    rest = []
+    system.rest_listeners.append(rest.append)
+
+    start = time.perf_counter()
+    frames = 0
+    if capture:
+        capture.start()
+    while frames < parameters["frames"] and not rest:
+        engine.step(parameters["width"], parameters["height"], parameters["damping"], dt)
+        frames += 1
+        if recorder:
+            recorder.record(system)
+        if writer:
+            writer.write(system)
+        if capture and capture.frame():
+            print(capture.stop(), file=sys.stderr)
+            capture = None
+    elapsed = time.perf_counter() - start
+    if capture:
+        print(capture.stop(), file=sys.stderr)
+    if recorder:
+        recorder.close()
+    if writer:
+        writer.close()
+
+    # Eingelochte Kugeln zählen als bewegt
+    ids = system.ids
+    moved = set(ids[(system.x != start_x[ids]) | (system.y != start_y[ids])].tolist())
+    moved.update(event["ball"] for event in pocketed)
+    stats = {
+        "balls": len(system),
+        "frames": frames,
+        "rest_frame": rest[0] if rest else None,
+        "seconds": elapsed,
+        "steps_per_second": frames / elapsed if elapsed > 0 else None,
+        "balls_moved": len(moved),
+        "pocketed": pocketed,
+    }
+    if parameters["engine"] == "event":
+        stats["events"] = engine.events
+    state = [
+        {"id": ball_id, "x": p.x, "y": p.y, "vx": p.vx, "vy": p.vy, "r": p.r, "mass": p.mass}
+        for ball_id, p in zip(ids.tolist(), system.particles)
+    ]
+    return {"parameters": parameters, "stats": stats, "particles": state}
+
+def main(argv=None):
+    args = parse_args(argv)
+    capture = Capture(args.profile_file or capture_path(), args.profile) if args.profile else None
+    result = run(load_parameters(args), args.record, args.trajectory, capture)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    else:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Optionale Beschleunigung der Stoßschleife in ParticleSystem.collide. Die
+# Kontakte müssen der Reihe nach aufgelöst werden (eine Kugel kann an
+# mehreren beteiligt sein), das lässt sich nicht mit NumPy vektorisieren.
+# Ist numba installiert, wird resolve_contacts übersetzt, sobald das erste
+# ParticleSystem angelegt wird (warm); sonst bleibt compiled None und ParticleSystem nutzt seine Python-Schleife.
+#
+# Die Rechnung ist dieselbe wie in particle.collide, in derselben
+# Reihenfolge der Operationen, damit die Ergebnisse bitgleich bleiben.
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+def resolve_contacts(first, second, x, y, vx, vy, mass, awake, still):
+    # Kontakte (first[k], second[k]) nacheinander auflösen, Geschwindigkeiten
+    # direkt in den Arrays ändern; gibt die Zahl der echten Stöße zurück
+    count = 0
+    for k in range(len(first)):
+        i = first[k]
+        j = second[k]
+        nx = x[j] - x[i]
+        ny = y[j] - y[i]
+        if (vx[i] - vx[j]) * nx + (vy[i] - vy[j]) * ny <= 0:
+            continue
+
+        nn = nx * nx + ny * ny
+        m1 = mass[i]
+        m2 = mass[j]
+        a1 = vx[i] * nx + vy[i] * ny
+        a2 = vx[j] * nx + vy[j] * ny
+        k1 = 2 * m2 * (a2 - a1) / ((m1 + m2) * nn)
+        k2 = 2 * m1 * (a1 - a2) / ((m1 + m2) * nn)
+        vx[i] = vx[i] + k1 * nx
+        vy[i] = vy[i] + k1 * ny
+        vx[j] = vx[j] + k2 * nx
+        vy[j] = vy[j] + k2 * ny
+
+        count += 1
+        awake[i] = True
+        awake[j] = True
+        still[i] = 0
+        still[j] = 0
+    return count
+
+compiled = njit(cache=True, nogil=True)(resolve_contacts) if njit else None
+
+warmed = False
+
+def warm():
+    # Einmal mit leerer Kontaktliste aufrufen, damit numba übersetzt (oder
+    # den Cache lädt), bevor gemessen oder gespielt wird, und nicht erst im
+    # ersten Schritt mit Kontakten
+    global warmed
+    if compiled is None or warmed:
+        return
+    none = np.empty(0, dtype=np.intp)
+    values = np.empty(0, dtype=np.float64)
+    compiled(none, none, values, values, values, values, values, np.empty(0, dtype=bool), values)
+    warmed = True
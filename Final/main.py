@@ -1,10 +1,27 @@
-import pygame
-import math
+import argparse
 import random
-from particle import Particle
+import pygame
+from scenarios import shoot
+from headless import build_system, cue_id
+from recording import Recorder
+from trajectory import TrajectoryWriter
+from render import DirtyRenderer
 from interface import get_user_input
-
-def main():
+from physics_thread import PhysicsThread
+from profiler import FrameTimer, TimingLog, Capture, capture_path
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Billard")
+    parser.add_argument("--seed", type=int, help="Startwert für den zufälligen Versatz (Standard: zufällig)")
+    parser.add_argument("--record", help="Lauf als Binärprotokoll in diese Datei schreiben (siehe replay.py)")
+    parser.add_argument("--trajectory", help="Trajektorie (float32, siehe trajectory.py) in diese Datei schreiben")
+    parser.add_argument("--timings", help="Perzentile der Frame-Zeiten in diese Datei schreiben (.csv laufend, .json beim Beenden mit den letzten 1000 Zeilen), F3 zeigt sie an")
+    parser.add_argument("--profile", type=int, metavar="FRAMES", help="Die ersten FRAMES Frames mit cProfile aufzeichnen; F4 startet später weitere Aufzeichnungen (Standard: 300 Frames)")
+    parser.add_argument("--profile-file", dest="profile_file", help="Datei für die Aufzeichnung (Standard: profile-<Datum>-<Zeit>.prof)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
     pygame.display.set_caption("Billard")
     pygame.init()
     screen = pygame.display.set_mode((int(1270 / 3), int(2540 / 3)))  # Neue Bildschirmgröße
@@ -68,76 +85,133 @@ def main():
 
     # Extrahieren der Benutzereinstellungen
     zoom = float(user_inputs[0]) if len(user_inputs) > 0 else 2.0
-    radius = 28.6 / zoom  
-    mass = 170 
     damping_factor = 1
     random_offset_input = user_inputs[1].lower() if len(user_inputs) > 1 else "nein"
     lines_input = user_inputs[2].lower() if len(user_inputs) > 2 else "nein"
     use_random_offset = random_offset_input == "ja"
+    use_grid = True  # False: alle Paare prüfen (Brute-Force zum Vergleichen)
+    physics_rate = 240  # Physikschritte pro Sekunde, unabhängig von den 60 Bildern pro Sekunde
 
-    # Partikel für die Simulation erstellen
-    particles = []
+    # Partikel für die Simulation erstellen, mit denselben Parametern wie
+    # headless.py, damit sich der Lauf nachspielen lässt
     canvas_width, canvas_height = screen.get_size()
-    center_x = canvas_width // 2
-    center_y = canvas_height // 2
-
-    start_x = center_x
-    start_y = center_y
-    num_rows = 5
-    count = 0
-    
-    for row in range(num_rows):
-        for col in range(row + 1):
-            while True:
-                offset = int(2 * radius) + (random.random() * 5 if use_random_offset else 0) 
-                x = start_x - col * offset + row * radius
-                y = start_y - row * offset
-                new_particle = Particle(x, y, int(radius), 0, 0, mass)
-                
-                overlap = False
-                for particle in particles:
-                    if new_particle.distance(particle) < new_particle.r + particle.r:
-                        overlap = True
-                        break
-                
-                if not overlap:
-                    particles.append(new_particle)
-                    count += 1
-                    break
-
-            if count >= 15:
-                break
-        if count >= 15:
-            break
-
-    # Benutzerkontrolliertes Partikel
-    user_particle = Particle(center_x, canvas_height - 50, int(radius), 0, 0, mass)
-    particles.append(user_particle)
+    parameters = {
+        "scenario": "rack",
+        "zoom": zoom,
+        "random_offset": use_random_offset,
+        "width": canvas_width,
+        "height": canvas_height,
+        "damping": damping_factor,
+        "grid": use_grid,
+        "max_travel": 0.5,
+        "ccd": True,
+        "separation": 4,
+        "engine": "fixed",
+        "rate": physics_rate,
+        "pockets": True,
+        "pocket_radius": 30.0,
+        "seed": args.seed if args.seed is not None else random.randrange(2 ** 32),
+    }
+    system = build_system(parameters)
+    user_id = cue_id(parameters)
+    recorder = Recorder(args.record, parameters, system) if args.record else None
+    writer = TrajectoryWriter(args.trajectory, len(system), parameters) if args.trajectory else None
+
+    # Hintergrund (Tisch) einmal zeichnen, danach nur geänderte Bereiche
+    background = pygame.Surface(screen.get_size()).convert()
+    background.fill((0, 0, 0))
+    for px, py in system.pockets.tolist():
+        pygame.draw.circle(background, (60, 60, 60), (int(px), int(py)), int(system.pocket_radius))
+    renderer = DirtyRenderer(background)
+
+    def record(system):
+        if recorder:
+            recorder.record(system)
+        if writer:
+            writer.write(system)
+
+    def make_shot(speed, angle):
+        def apply(system):
+            shoot(system.find(user_id), speed, angle)
+            if recorder:
+                recorder.shot(system.frame, speed, angle)
+        return apply
+
+    # Die Physik läuft mit fester Rate in einem eigenen Thread; die
+    # Hauptschleife zeichnet nur den zuletzt veröffentlichten Zustand
+    physics = PhysicsThread(system, canvas_width, canvas_height, damping_factor, physics_rate, record)
+    physics.start()
+
+    # Zeitmessung pro Frame, F3 blendet die Perzentile ein
+    timer = FrameTimer()
+    timings = TimingLog(args.timings, timer) if args.timings else None
+    overlay_font = pygame.font.Font(None, 18)
+    overlay = None
+    show_overlay = False
+
+    # cProfile-Aufzeichnung über die nächsten Frames, mit --profile sofort, sonst per F4
+    def start_capture():
+        capture = Capture(args.profile_file or capture_path(), args.profile or 300, physics)
+        capture.start()
+        return capture
+    capture = start_capture() if args.profile else None
 
     # Hauptsimulationsschleife
     while running:
+        timer.start()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
+                if event.key == pygame.K_F3:
+                    show_overlay = not show_overlay
+                    renderer.invalidate()
+                elif event.key == pygame.K_F4 and capture is None:
+                    capture = start_capture()
+                elif event.key == pygame.K_SPACE:
+                    physics.pause()  # Während der Eingabe steht der Tisch still
                     speed = get_user_input("Geschwindigkeit eingeben: ", screen, font, back_button, next_button, quit_button, False)[0]
                     angle = get_user_input("Winkel eingeben (Grad): ", screen, font, back_button, next_button, quit_button, False)[0]
-                    speed = float(speed)
-                    angle = float(angle)
-                    angle = math.radians(angle)
-                    user_particle.vx = speed * math.cos(angle)
-                    user_particle.vy = -speed * math.sin(angle)
-
-        screen.fill((0, 0, 0))
-
-        for i, particle in enumerate(particles):
-            particle.update(canvas_width, canvas_height, particles, i, damping_factor)
-            particle.draw(screen, lines_input)
-
-        pygame.display.flip()
+                    physics.submit(make_shot(float(speed), float(angle)))
+                    physics.resume()
+                    renderer.invalidate()
+
+        timer.lap("events")
+
+        # Zwischen den letzten beiden Physikschritten interpoliert
+        rects = renderer.draw(screen, physics.state(), lines_input)
+        if show_overlay:
+            if overlay is None:
+                lines = [overlay_font.render(line, True, (255, 255, 255)) for line in timer.lines()]
+                overlay = pygame.Surface((max(line.get_width() for line in lines) + 8, 14 * len(lines) + 6))
+                for k, line in enumerate(lines):
+                    overlay.blit(line, (4, 3 + 14 * k))
+            rects.append(screen.blit(overlay, (0, 0)))
+            # Im nächsten Frame wieder mit dem Tisch übermalen
+            renderer.invalidate(rects[-1])
+        timer.lap("draw")
+
+        pygame.display.update(rects)
+        timer.lap("display")
+        timer.physics(physics.stats())
+        if timer.stop():
+            overlay = None
+            if timings:
+                timings.write()
+        if capture and capture.frame():
+            print(capture.stop())
+            capture = None
         clock.tick(60)
 
+    if capture:
+        print(capture.stop())
+    physics.stop()
+    if recorder:
+        recorder.close()
+    if writer:
+        writer.close()
+    if timings:
+        timings.close()
     pygame.quit()
 
 if __name__ == "__main__":
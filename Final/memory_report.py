@@ -0,0 +1,73 @@
+import argparse
+import json
+import random
+import sys
+import tracemalloc
+from particle import Particle
+from system import ParticleSystem
+from kernel import warm
+
+# Speicherbedarf pro Kugel bei großen Kugelzahlen:
+#   vorher          Particle mit __dict__ (wie bis zur Umstellung auf __slots__)
+#   Particle        Particle mit __slots__
+#   ParticleSystem  float64-Arrays plus eine ParticleView pro Kugel
+#   python memory_report.py --balls 100000
+
+class DictParticle:
+    # Frühere Particle-Klasse, nur für den Vergleich
+    def __init__(self, x, y, r, vx, vy, mass):
+        self.x = x
+        self.y = y
+        self.r = r
+        self.vx = vx
+        self.vy = vy
+        self.mass = mass
+
+def make(cls, count, seed):
+    rng = random.Random(seed)
+    return [cls(rng.uniform(0, 800), rng.uniform(0, 600), rng.randint(10, 20),
+                rng.uniform(-2, 2), rng.uniform(-2, 2), rng.uniform(0.5, 2)) for _ in range(count)]
+
+def traced(function):
+    # Zusätzlich belegter Speicher nach function(); das Ergebnis bleibt dabei am Leben
+    tracemalloc.start()
+    result = function()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, result
+
+def report(count, seed):
+    rows = []
+    for name, cls in (("vorher", DictParticle), ("Particle", Particle)):
+        size, particles = traced(lambda: make(cls, count, seed))
+        rows.append({"layout": name, "bytes_per_ball": size / count, "instance_bytes": sys.getsizeof(particles[0])})
+        del particles
+
+    # numba vorab übersetzen; ParticleSystem tut das sonst im Konstruktor,
+    # und der Übersetzer belegt mehr Speicher als die Arrays
+    warm()
+    particles = make(Particle, count, seed)
+    size, system = traced(lambda: ParticleSystem(particles))
+    rows.append({"layout": "ParticleSystem", "bytes_per_ball": size / count, "instance_bytes": sys.getsizeof(system.views[0])})
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Speicher pro Kugel für Particle und ParticleSystem")
+    parser.add_argument("--balls", type=int, default=100000, help="Anzahl der Kugeln")
+    parser.add_argument("--seed", type=int, default=0, help="Startwert für die Werte")
+    parser.add_argument("--output", help="Ergebnis als JSON in diese Datei schreiben")
+    args = parser.parse_args(argv)
+
+    rows = report(args.balls, args.seed)
+    before = rows[0]["bytes_per_ball"]
+    print("%d Kugeln" % args.balls)
+    for row in rows:
+        print("%-15s %7.1f B/Kugel  (Objekt %3d B)  %5.2fx" % (
+            row["layout"], row["bytes_per_ball"], row["instance_bytes"], before / row["bytes_per_ball"]))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"balls": args.balls, "results": rows}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import argparse
+import csv
+import multiprocessing
+import random
+import sys
+import time
+import numpy as np
+from headless import DEFAULTS
+from scenarios import build_rack, shoot
+from system import ParticleSystem
+
+# Monte-Carlo-Auswertung des Anstoßes: viele unabhängige Simulationen des
+# Dreiecks aus main.py mit zufälliger Geschwindigkeit, Winkel und Versatz,
+# verteilt auf einen multiprocessing-Pool. Beispiel:
+#   python montecarlo.py --runs 2000 --speed 6 10 --angle 85 95 --output anstoss.csv
+
+COLUMNS = ("run", "seed", "speed", "angle", "jitter", "balls_moved", "spread", "rest_frame", "frames")
+
+def make_tasks(runs, seed, speed, angle, jitter, settings):
+    # Alle Parameter und Seeds zieht der Hauptprozess, damit das Ergebnis
+    # nicht davon abhängt, welcher Worker welchen Lauf bekommt
+    rng = random.Random(seed)
+    tasks = []
+    for run in range(runs):
+        task = dict(settings)
+        task.update({
+            "run": run,
+            "seed": rng.getrandbits(32),
+            "speed": rng.uniform(*speed),
+            "angle": rng.uniform(*angle),
+            "jitter": rng.uniform(*jitter),
+        })
+        tasks.append(task)
+    return tasks
+
+def run_break(task):
+    width, height = task["width"], task["height"]
+    rng = random.Random(task["seed"])
+    particles = build_rack(width, height, 28.6 / task["zoom"], 170, task["jitter"] > 0, rng, task["jitter"])
+    system = ParticleSystem(particles)
+    shoot(system.particles[-1], task["speed"], task["angle"])
+
+    start_x = system.x.copy()
+    start_y = system.y.copy()
+    rest = []
+    system.rest_listeners.append(rest.append)
+
+    frames = 0
+    while frames < task["frames"] and not rest:
+        system.step(width, height, task["damping"])
+        frames += 1
+
+    # Nur die 15 Objektkugeln, die weiße Kugel ist die letzte
+    moved = np.hypot(system.x - start_x, system.y - start_y)[:-1] > 1
+    spread = np.hypot(system.x[:-1] - system.x[:-1].mean(), system.y[:-1] - system.y[:-1].mean()).mean()
+
+    return {
+        "run": task["run"],
+        "seed": task["seed"],
+        "speed": task["speed"],
+        "angle": task["angle"],
+        "jitter": task["jitter"],
+        "balls_moved": int(moved.sum()),
+        "spread": float(spread),
+        "rest_frame": rest[0] if rest else None,
+        "frames": frames,
+    }
+
+def analyze(tasks, workers=None):
+    with multiprocessing.Pool(workers) as pool:
+        results = pool.map(run_break, tasks, chunksize=max(1, len(tasks) // (8 * (workers or multiprocessing.cpu_count()))))
+    return sorted(results, key=lambda result: result["run"])
+
+def summarize(results):
+    rested = [r["rest_frame"] for r in results if r["rest_frame"] is not None]
+    return {
+        "runs": len(results),
+        "balls_moved": float(np.mean([r["balls_moved"] for r in results])),
+        "spread": float(np.mean([r["spread"] for r in results])),
+        "rested": len(rested),
+        "rest_frame": float(np.mean(rested)) if rested else None,
+    }
+
+def write_table(results, f):
+    writer = csv.DictWriter(f, fieldnames=COLUMNS)
+    writer.writeheader()
+    writer.writerows(results)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte-Carlo-Auswertung des Anstoßes")
+    parser.add_argument("--runs", type=int, default=1000, help="Anzahl der Simulationen")
+    parser.add_argument("--seed", type=int, default=0, help="Startwert für alle Zufallszahlen")
+    parser.add_argument("--speed", type=float, nargs=2, default=(5.0, 10.0), metavar=("MIN", "MAX"), help="Bereich der Geschwindigkeit")
+    parser.add_argument("--angle", type=float, nargs=2, default=(80.0, 100.0), metavar=("MIN", "MAX"), help="Bereich des Winkels in Grad")
+    parser.add_argument("--jitter", type=float, nargs=2, default=(0.0, 5.0), metavar=("MIN", "MAX"), help="Bereich des zufälligen Versatzes im Dreieck")
+    parser.add_argument("--zoom", type=float, default=2.0, help="Zoom wie im Fenster, Radius = 28.6 / Zoom")
+    parser.add_argument("--damping", type=float, default=0.995, help="Dämpfungsfaktor pro Schritt")
+    parser.add_argument("--frames", type=int, default=5000, help="Höchstzahl der Schritte pro Lauf")
+    parser.add_argument("--workers", type=int, help="Anzahl der Prozesse (Standard: alle Kerne)")
+    parser.add_argument("--output", help="Ergebnistabelle als CSV in diese Datei statt auf stdout")
+    args = parser.parse_args(argv)
+
+    settings = dict(DEFAULTS["rack"], zoom=args.zoom, damping=args.damping, frames=args.frames)
+    tasks = make_tasks(args.runs, args.seed, args.speed, args.angle, args.jitter, settings)
+
+    start = time.perf_counter()
+    results = analyze(tasks, args.workers)
+    elapsed = time.perf_counter() - start
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            write_table(results, f)
+    else:
+        write_table(results, sys.stdout)
+
+    summary = summarize(results)
+    print("%d Läufe in %.1f s" % (summary["runs"], elapsed), file=sys.stderr)
+    print("bewegte Kugeln: %.2f, Streuung: %.1f px, in Ruhe: %d, Frames bis Ruhe: %s" % (
+        summary["balls_moved"], summary["spread"], summary["rested"],
+        "%.0f" % summary["rest_frame"] if summary["rest_frame"] is not None else "-"), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
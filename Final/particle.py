@@ -1,18 +1,13 @@
 import math
-import pygame
 
-class Particle:
-    def __init__(self, x, y, r, vx, vy, mass):
-        self.x = x
-        self.y = y
-        self.r = r
-        self.vx = vx
-        self.vy = vy
-        self.mass = mass
+class Body:
+    # Gemeinsame Methoden für Particle und ParticleView (system.py); ohne
+    # eigene Attribute, damit Sichten keine leeren Felder mitschleppen
+    __slots__ = ()
 
     @property
     def velocity(self):
-        return [self.vx, self.vy]
+        return (self.vx, self.vy)
 
     @property
     def speed(self):
@@ -23,24 +18,44 @@ class Particle:
         dy = self.y - other_particle.y
         return math.sqrt(dx * dx + dy * dy)
 
-    def update(self, canvas_width, canvas_height, particles, start, damping_factor):
-        for i in range(start + 1, len(particles)):
+    def draw(self, screen, lines):
+        # Erst hier importieren, damit die Physik ohne SDL läuft
+        import pygame
+
+        speed = self.speed
+        color = (min(int(speed * 100), 255), 0, max(255 - int(speed * 100), 0))
+
+        pygame.draw.circle(screen, color, (int(self.x), int(self.y)), self.r)
+
+        if speed > 0.2 and lines == "ja":
+            direction_line_length = speed * 30 + self.r
+            end_x = int(self.x + direction_line_length * self.vx / speed)
+            end_y = int(self.y + direction_line_length * self.vy / speed)
+            pygame.draw.line(screen, color, (int(self.x), int(self.y)), (end_x, end_y), 2)
+
+class Particle(Body):
+    # Feste Attribute statt __dict__: spart bei vielen Kugeln deutlich Speicher
+    # (siehe memory_report.py)
+    __slots__ = ("x", "y", "r", "vx", "vy", "mass")
+
+    def __init__(self, x, y, r, vx, vy, mass):
+        self.x = x
+        self.y = y
+        self.r = r
+        self.vx = vx
+        self.vy = vy
+        self.mass = mass
+
+    def update(self, canvas_width, canvas_height, particles, start, damping_factor, grid=None):
+        # Mit Gitter nur die Nachbarzellen prüfen, sonst alle folgenden Kugeln
+        others = range(start + 1, len(particles)) if grid is None else grid.candidates(start)
+        for i in others:
             other_particle = particles[i]
             if self.distance(other_particle) < self.r + other_particle.r:
-                res = [self.vx - other_particle.vx, self.vy - other_particle.vy]
-                if res[0] * (other_particle.x - self.x) + res[1] * (other_particle.y - self.y) >= 0:
-                    m1 = self.mass
-                    m2 = other_particle.mass
-                    theta = -math.atan2(other_particle.y - self.y, other_particle.x - self.x)
-                    u1 = rotate(self.velocity, theta)
-                    u2 = rotate(other_particle.velocity, theta)
-                    v1 = rotate([u1[0] * (m1 - m2) / (m1 + m2) + u2[0] * 2 * m2 / (m1 + m2), u1[1]], -theta)
-                    v2 = rotate([u2[0] * (m2 - m1) / (m1 + m2) + u1[0] * 2 * m1 / (m1 + m2), u2[1]], -theta)
-
-                    self.vx = v1[0]
-                    self.vy = v1[1]
-                    other_particle.vx = v2[0]
-                    other_particle.vy = v2[1]
+                result = collide(self.x, self.y, self.vx, self.vy, self.mass,
+                                 other_particle.x, other_particle.y, other_particle.vx, other_particle.vy, other_particle.mass)
+                if result is not None:
+                    self.vx, self.vy, other_particle.vx, other_particle.vy = result
 
         if self.x - self.r <= 0:
             self.x = self.r
@@ -66,21 +81,30 @@ class Particle:
         self.x += self.vx
         self.y += self.vy        
 
-    def draw(self, screen, lines):
-        speed = self.speed
-        color = (min(int(speed * 100), 255), 0, max(255 - int(speed * 100), 0))
-
-        pygame.draw.circle(screen, color, (int(self.x), int(self.y)), self.r)
-
-        if speed > 0.2 and lines == "ja":
-            direction_line_length = speed * 30 + self.r
-            end_x = int(self.x + direction_line_length * self.vx / speed)
-            end_y = int(self.y + direction_line_length * self.vy / speed)
-            pygame.draw.line(screen, color, (int(self.x), int(self.y)), (end_x, end_y), 2)
+def collide(x1, y1, vx1, vy1, m1, x2, y2, vx2, vy2, m2):
+    # Elastischer Stoß zweier sich berührender Kugeln; None, wenn sie sich
+    # nicht annähern (dann gäbe es ohnehin nichts auszutauschen). Nur die
+    # Komponente entlang der Verbindungslinie wird ausgetauscht, daher
+    # reichen Projektionen (ohne Winkel, Wurzel oder Drehung).
+    #
+    # Bei gleicher Geschwindigkeit oder deckungsgleichen Mittelpunkten ist
+    # das Skalarprodukt 0: kein Stoß, damit ruhende Paare schlafen können.
+    # Deckungsgleiche Kugeln trennt ParticleSystem.separate.
+    nx = x2 - x1
+    ny = y2 - y1
+    if (vx1 - vx2) * nx + (vy1 - vy2) * ny <= 0:
+        return None
+
+    nn = nx * nx + ny * ny
+    a1 = vx1 * nx + vy1 * ny
+    a2 = vx2 * nx + vy2 * ny
+    k1 = 2 * m2 * (a2 - a1) / ((m1 + m2) * nn)
+    k2 = 2 * m1 * (a1 - a2) / ((m1 + m2) * nn)
+    return vx1 + k1 * nx, vy1 + k1 * ny, vx2 + k2 * nx, vy2 + k2 * ny
 
 def rotate(velocity, theta):
-    return [
+    return (
         velocity[0] * math.cos(theta) - velocity[1] * math.sin(theta),
         velocity[0] * math.sin(theta) + velocity[1] * math.cos(theta)
-    ]
+    )
 
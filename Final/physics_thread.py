@@ -0,0 +1,108 @@
+import queue
+import threading
+import time
+import traceback
+from system import FRAME_RATE
+
+# Physik in einem eigenen Thread, damit ein langsames display.flip oder ein
+# Eingabedialog die Simulation nicht aufhält. Nach jedem Schritt wird ein
+# Snapshot veröffentlicht; der Zeichen-Thread liest immer das Paar aus
+# vorletztem und letztem Snapshot (Doppelpuffer) und interpoliert dazwischen.
+# Snapshots werden nach dem Veröffentlichen nicht mehr verändert, deshalb
+# braucht das Lesen den Lock nur für den Austausch der Referenzen.
+#
+# Änderungen am System von außen (z.B. Anstoß) laufen über submit() und
+# werden zwischen zwei Schritten im Physik-Thread ausgeführt.
+
+class PhysicsThread(threading.Thread):
+    def __init__(self, system, canvas_width, canvas_height, damping_factor, rate, on_step=None):
+        threading.Thread.__init__(self, name="physics", daemon=True)
+        self.system = system
+        self.canvas = (canvas_width, canvas_height)
+        self.damping_factor = damping_factor
+        self.step_time = 1 / rate
+        self.dt = FRAME_RATE / rate
+        self.on_step = on_step
+
+        self.commands = queue.Queue()
+        self.lock = threading.Lock()
+        snapshot = system.snapshot()
+        self.buffers = (snapshot, snapshot)
+        self.published = time.perf_counter()
+        self.stopped = threading.Event()
+        self.resumed = threading.Event()
+        self.resumed.set()
+        self.steps = 0
+        self.step_seconds = 0.0
+        self.counters = self.count()
+
+    def submit(self, command):
+        # command(system) wird vor dem nächsten Schritt im Physik-Thread aufgerufen
+        self.commands.put(command)
+
+    def pause(self):
+        self.resumed.clear()
+
+    def resume(self):
+        self.resumed.set()
+
+    def stop(self):
+        self.stopped.set()
+        self.resumed.set()
+        self.join()
+
+    def state(self):
+        # Zustand zum Zeichnen, zwischen den letzten beiden Schritten interpoliert
+        with self.lock:
+            previous, current = self.buffers
+            published = self.published
+        alpha = min((time.perf_counter() - published) / self.step_time, 1.0)
+        return previous.interpolate(current, alpha)
+
+    def count(self):
+        system = self.system
+        return {"steps": self.steps, "physics": self.step_seconds, "pockets": system.capture_time,
+                "candidates": system.candidates, "contacts": system.contacts}
+
+    def stats(self):
+        # Laufende Summen für profiler.FrameTimer, Stand des letzten Schritts
+        with self.lock:
+            return dict(self.counters)
+
+    def run(self):
+        next_step = time.perf_counter()
+        while not self.stopped.is_set():
+            if not self.resumed.is_set():
+                self.resumed.wait()
+                next_step = time.perf_counter()
+                continue
+
+            while not self.commands.empty():
+                command = self.commands.get()
+                # Ein fehlerhafter Befehl darf die Simulation nicht anhalten
+                try:
+                    command(self.system)
+                except Exception:
+                    traceback.print_exc()
+
+            started = time.perf_counter()
+            self.system.step(self.canvas[0], self.canvas[1], self.damping_factor, self.dt)
+            self.steps += 1
+            self.step_seconds += time.perf_counter() - started
+            if self.on_step:
+                self.on_step(self.system)
+
+            snapshot = self.system.snapshot()
+            with self.lock:
+                self.buffers = (self.buffers[1], snapshot)
+                self.published = time.perf_counter()
+                self.counters = self.count()
+
+            # Feste Rate halten; liegt der Thread mehr als eine Viertelsekunde
+            # zurück, nicht im Zeitraffer aufholen
+            next_step += self.step_time
+            delay = next_step - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -0.25:
+                next_step = time.perf_counter()
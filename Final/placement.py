@@ -0,0 +1,168 @@
+import math
+import random
+from particle import Particle
+
+# Aufstellungen ohne Überlappung. Placement merkt sich alle gesetzten Kugeln
+# in einem Gitter mit dem größten Durchmesser als Zellgröße, ein neuer Kreis
+# wird nur gegen die 3x3 Nachbarzellen geprüft statt gegen alle Kugeln.
+#
+# scatter verteilt Kugeln zufällig wie build_random, aber ohne Überlappung
+# (Pfeilwurf mit Verwerfen, ergibt eine Poisson-Disk-artige Verteilung).
+# eight_ball, nine_ball und snooker stellen die üblichen Dreiecke und Spots
+# auf. Die Reihenfolge der Kugeln entspricht den Kugelnummern (Snooker: 15
+# Rote, dann Gelb, Grün, Braun, Blau, Pink, Schwarz), die weiße ist wie in
+# scenarios.py immer die letzte. Alles ist über rng reproduzierbar.
+
+# Abstand zwischen Kugeln im Dreieck, damit sie sich gerade nicht berühren
+GAP = 0.01
+
+class Placement:
+    def __init__(self, max_radius):
+        self.size = 2 * max_radius
+        self.cells = {}
+
+    def cell(self, x, y):
+        return (math.floor(x / self.size), math.floor(y / self.size))
+
+    def fits(self, x, y, r):
+        cx, cy = self.cell(x, y)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for ox, oy, other in self.cells.get((cx + dx, cy + dy), ()):
+                    # Gleiche Rechnung wie Particle.distance
+                    ex = x - ox
+                    ey = y - oy
+                    if math.sqrt(ex * ex + ey * ey) < r + other:
+                        return False
+        return True
+
+    def add(self, x, y, r):
+        self.cells.setdefault(self.cell(x, y), []).append((x, y, r))
+
+def scatter(canvas_width, canvas_height, count, rng=random, radius=(10, 20), attempts=100):
+    # Wie build_random (Radius, Geschwindigkeit, Masse), weiße Kugel in der
+    # Mitte, aber keine Kugel überlappt eine andere oder die Bande
+    cue_x, cue_y, cue_r = canvas_width / 2, canvas_height / 2, 15
+    placement = Placement(max(radius[1], cue_r))
+    placement.add(cue_x, cue_y, cue_r)
+
+    particles = []
+    for _ in range(count):
+        r = rng.randint(*radius)
+        for _ in range(attempts):
+            x = rng.uniform(r, canvas_width - r)
+            y = rng.uniform(r, canvas_height - r)
+            if placement.fits(x, y, r):
+                break
+        else:
+            raise ValueError("Kein Platz für Kugel %d von %d auf %dx%d" % (len(particles) + 1, count, canvas_width, canvas_height))
+        placement.add(x, y, r)
+        vx = rng.uniform(-2, 2)
+        vy = rng.uniform(-2, 2)
+        mass = rng.uniform(0.5, 2)
+        particles.append(Particle(x, y, r, vx, vy, mass))
+
+    particles.append(Particle(cue_x, cue_y, cue_r, 0, 0, 1))
+    return particles
+
+def foot_spot(canvas_height, radius, rows, spacing):
+    # Fußpunkt im oberen Viertel; große Kugeln rücken so weit zur Mitte,
+    # dass die letzte Reihe noch auf den Tisch passt
+    depth = (len(rows) - 1) * spacing * math.sqrt(3) / 2
+    return max(canvas_height / 4, depth + radius + spacing / 2)
+
+def triangle_spots(apex_x, apex_y, rows, spacing):
+    # Reihen wachsen vom Fußpunkt nach oben, rows[k] Kugeln in Reihe k
+    spots = []
+    for row in range(len(rows)):
+        y = apex_y - row * spacing * math.sqrt(3) / 2
+        for col in range(rows[row]):
+            spots.append((apex_x + (col - (rows[row] - 1) / 2) * spacing, y))
+    return spots
+
+def place(canvas_width, canvas_height, spots, radius, mass, rng, jitter):
+    # Kugeln an die Spots setzen, jeweils bis zu jitter Pixel versetzt;
+    # ValueError, wenn etwas nicht auf den Tisch passt
+    placement = Placement(radius)
+    particles = []
+    for x, y in spots:
+        if jitter:
+            angle = rng.uniform(0, 2 * math.pi)
+            distance = rng.uniform(0, jitter)
+            x += distance * math.cos(angle)
+            y += distance * math.sin(angle)
+        if not (radius <= x <= canvas_width - radius and radius <= y <= canvas_height - radius) or not placement.fits(x, y, radius):
+            raise ValueError("Aufstellung passt mit Radius %g nicht auf %dx%d" % (radius, canvas_width, canvas_height))
+        placement.add(x, y, radius)
+        particles.append(Particle(x, y, radius, 0, 0, mass))
+    return particles
+
+def eight_ball(canvas_width, canvas_height, radius, mass, rng=random, jitter=0):
+    # 15 Kugeln im Dreieck, Spitze auf dem Fußpunkt (oberes Viertel),
+    # 8 in der Mitte, in den hinteren Ecken eine volle und eine halbe
+    spacing = 2 * (radius + jitter) + GAP
+    rows = (1, 2, 3, 4, 5)
+    spots = triangle_spots(canvas_width / 2, foot_spot(canvas_height, radius, rows, spacing), rows, spacing)
+
+    solids = [1, 2, 3, 4, 5, 6, 7]
+    stripes = [9, 10, 11, 12, 13, 14, 15]
+    rng.shuffle(solids)
+    rng.shuffle(stripes)
+    corners = [solids.pop(), stripes.pop()]
+    rng.shuffle(corners)
+    rest = solids + stripes
+    rng.shuffle(rest)
+
+    numbers = {4: 8, 10: corners[0], 14: corners[1]}
+    for spot in range(len(spots)):
+        if spot not in numbers:
+            numbers[spot] = rest.pop()
+    by_number = sorted(range(len(spots)), key=numbers.get)
+
+    cue = (canvas_width / 2, canvas_height * 3 / 4)
+    return place(canvas_width, canvas_height, [spots[i] for i in by_number] + [cue], radius, mass, rng, jitter)
+
+def nine_ball(canvas_width, canvas_height, radius, mass, rng=random, jitter=0):
+    # Raute aus 9 Kugeln, 1 an der Spitze, 9 in der Mitte
+    spacing = 2 * (radius + jitter) + GAP
+    rows = (1, 2, 3, 2, 1)
+    spots = triangle_spots(canvas_width / 2, foot_spot(canvas_height, radius, rows, spacing), rows, spacing)
+
+    rest = list(range(2, 9))
+    rng.shuffle(rest)
+    numbers = {0: 1, 4: 9}
+    for spot in range(len(spots)):
+        if spot not in numbers:
+            numbers[spot] = rest.pop()
+    by_number = sorted(range(len(spots)), key=numbers.get)
+
+    cue = (canvas_width / 2, canvas_height * 3 / 4)
+    return place(canvas_width, canvas_height, [spots[i] for i in by_number] + [cue], radius, mass, rng, jitter)
+
+def snooker(canvas_width, canvas_height, radius, mass, rng=random, jitter=0):
+    # Spots nach den Maßen eines 12-Fuß-Tischs, Baulk unten
+    spacing = 2 * (radius + jitter) + GAP
+    center_x = canvas_width / 2
+    baulk = canvas_height * (1 - 29 / 144)
+    d_radius = canvas_width * 11.5 / 72
+    pink = (center_x, canvas_height / 4)
+    reds = triangle_spots(center_x, pink[1] - spacing, (1, 2, 3, 4, 5), spacing)
+    # Auf kleinen Tischen reichen die Roten bis über den schwarzen Spot,
+    # Schwarz rückt dann hinter das Dreieck
+    black_y = min(canvas_height * 12.75 / 144, reds[-1][1] - spacing)
+    colours = [
+        (center_x + d_radius, baulk),  # Gelb
+        (center_x - d_radius, baulk),  # Grün
+        (center_x, baulk),  # Braun
+        (center_x, canvas_height / 2),  # Blau
+        pink,
+        (center_x, black_y),
+    ]
+    cue = (center_x + d_radius / 2, baulk + d_radius / 2)
+    return place(canvas_width, canvas_height, reds + colours + [cue], radius, mass, rng, jitter)
+
+RACKS = {
+    "8ball": eight_ball,
+    "9ball": nine_ball,
+    "snooker": snooker,
+}
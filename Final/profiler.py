@@ -0,0 +1,189 @@
+import collections
+import cProfile
+import csv
+import io
+import json
+import pstats
+import re
+import sys
+import threading
+import time
+import numpy as np
+
+# Zeitmessung pro gezeichnetem Frame für die Hauptschleife in main.py. Jeder
+# Frame wird mit lap() in Abschnitte geteilt (Ereignisse, Zeichnen, Anzeige);
+# die Physik läuft im eigenen Thread und wird über die Zähler aus
+# PhysicsThread.stats() dazugerechnet (Zeit, Taschenprüfung, Kandidaten und
+# echte Stöße seit dem letzten Frame).
+#
+# Über die letzten window Frames werden alle interval Frames Perzentile
+# berechnet; sie landen im Overlay und in history (die letzten keep Zeilen).
+# TimingLog schreibt sie als CSV Zeile für Zeile mit oder als JSON beim
+# Beenden (nach Dateiendung).
+#
+# Capture zeichnet die nächsten Frames mit cProfile auf und schreibt eine
+# .prof-Datei (z.B. für python -m pstats oder snakeviz).
+
+PERCENTILES = (50, 90, 99)
+# Zeiten in Sekunden, im Overlay und in der Ausgabe in Millisekunden
+TIMES = ("frame", "events", "physics", "pockets", "draw", "display")
+COUNTS = ("steps", "candidates", "contacts")
+COLUMNS = ["frame", "time"] + ["%s_p%d" % (name, p) for name in TIMES + COUNTS for p in PERCENTILES]
+# Funktionen, in denen nur gewartet wird; fehlen in der Zusammenfassung
+IDLE = re.compile(r"\b(tick|sleep|wait|acquire|select|poll)\b")
+
+class FrameTimer:
+    def __init__(self, window=600, interval=30, keep=1000):
+        self.samples = collections.deque(maxlen=window)
+        self.interval = interval
+        self.history = collections.deque(maxlen=keep)
+        self.latest = {}
+        self.frames = 0
+        self.current = {}
+        self.started = None
+        self.last = None
+        self.counters = None
+
+    def start(self):
+        self.current = dict.fromkeys(TIMES + COUNTS, 0)
+        self.started = self.last = time.perf_counter()
+
+    def lap(self, name):
+        # Zeit seit dem letzten lap() (oder start()) dem Abschnitt name zuschlagen
+        now = time.perf_counter()
+        self.current[name] += now - self.last
+        self.last = now
+
+    def physics(self, stats):
+        # stats: laufende Summen aus PhysicsThread.stats(); gezählt wird der
+        # Zuwachs seit dem letzten Frame
+        if self.counters is not None:
+            for name, value in stats.items():
+                self.current[name] += value - self.counters[name]
+        self.counters = stats
+
+    def stop(self):
+        # Frame abschließen; True, wenn neue Perzentile berechnet wurden
+        self.current["frame"] = time.perf_counter() - self.started
+        self.samples.append(self.current)
+        self.frames += 1
+        if self.frames % self.interval:
+            return False
+
+        row = {"frame": self.frames, "time": time.time()}
+        for name in TIMES + COUNTS:
+            values = np.array([sample[name] for sample in self.samples], dtype=np.float64)
+            if name in TIMES:
+                values *= 1000
+            for p, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+                row["%s_p%d" % (name, p)] = float(value)
+        self.latest = row
+        self.history.append(row)
+        return True
+
+    def lines(self):
+        # Text für das Overlay
+        if not self.latest:
+            return ["Messung läuft ..."]
+        result = ["%-9s %6s %6s %6s" % ("ms", "p50", "p90", "p99")]
+        for name in TIMES + COUNTS:
+            if name == "steps":
+                result.append("%-9s %6s %6s %6s" % ("pro Frame", "p50", "p90", "p99"))
+            result.append("%-9s %6.1f %6.1f %6.1f" % ((name,) + tuple(self.latest["%s_p%d" % (name, p)] for p in PERCENTILES)))
+        return result
+
+class TimingLog:
+    # CSV bleibt offen und bekommt jede neue Zeile angehängt; JSON wird erst
+    # in close() geschrieben und enthält nur die Zeilen aus timer.history
+    def __init__(self, path, timer):
+        self.path = path
+        self.timer = timer
+        self.file = None
+        if not path.endswith(".json"):
+            self.file = open(path, "w", newline="")
+            self.out = csv.DictWriter(self.file, COLUMNS)
+            self.out.writeheader()
+
+    def write(self):
+        # Nach jedem timer.stop(), das True liefert
+        if self.file:
+            self.out.writerow(self.timer.latest)
+            self.file.flush()
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            return
+        with open(self.path, "w") as f:
+            json.dump({"window": self.timer.samples.maxlen, "interval": self.timer.interval,
+                       "rows": list(self.timer.history)}, f, indent=2)
+
+def capture_path():
+    return time.strftime("profile-%Y%m%d-%H%M%S.prof")
+
+def idle(function):
+    # Wartezeiten (Clock.tick, time.sleep, Event.wait, ...) sind kein Hot Spot
+    return IDLE.search(function[2]) is not None
+
+def summary(stats, limit=15):
+    # Die langsamsten Funktionen nach eigener Zeit (ohne Unteraufrufe),
+    # Wartezeiten werden übersprungen
+    out = io.StringIO()
+    stats.stream = out
+    stats.strip_dirs().sort_stats("tottime")
+    busy = [function for function in stats.fcn_list if not idle(function)]
+    print("Ohne Wartezeiten (tick, sleep, wait), sortiert nach eigener Zeit\n", file=out)
+    stats.print_title()
+    for function in busy[:limit]:
+        stats.print_line(function)
+    return out.getvalue()
+
+# Bis Python 3.11 misst cProfile nur den Thread, in dem enable() aufgerufen
+# wird; ab 3.12 läuft es über sys.monitoring für alle Threads, ein zweites
+# Profil gleichzeitig ist dort nicht erlaubt
+PER_THREAD = sys.version_info < (3, 12)
+
+class Capture:
+    # Mit physics läuft bis 3.11 ein zweites Profil im Physik-Thread (über
+    # submit()); beide werden beim Schreiben zusammengeführt.
+    def __init__(self, path, frames, physics=None):
+        self.path = path
+        self.frames = frames
+        self.physics = physics if PER_THREAD else None
+        self.profiles = [cProfile.Profile()]
+        self.count = 0
+
+    def start(self):
+        if self.physics:
+            profile = cProfile.Profile()
+            self.profiles.append(profile)
+            self.physics.submit(lambda system: profile.enable())
+        self.profiles[0].enable()
+
+    def frame(self):
+        # Nach jedem Frame aufrufen; True, sobald genug Frames gemessen sind
+        self.count += 1
+        return self.count >= self.frames
+
+    def stop(self, limit=15):
+        # Messung beenden, .prof schreiben und die Zusammenfassung liefern
+        self.profiles[0].disable()
+        note = ""
+        if self.physics:
+            done = threading.Event()
+            profile = self.profiles[1]
+            def finish(system):
+                profile.disable()
+                done.set()
+            self.physics.submit(finish)
+            # Pausiert der Physik-Thread gerade, nicht ewig warten. Das Profil
+            # läuft dann dort noch und darf nicht von hier gelesen werden.
+            if not done.wait(1.0):
+                self.profiles.pop()
+                note = "Physik-Thread hat nicht rechtzeitig angehalten, nur der Hauptthread ist enthalten\n"
+
+        stats = pstats.Stats(self.profiles[0])
+        for profile in self.profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(self.path)
+        return "%d Frames, gespeichert in %s\n%s%s" % (self.count, self.path, note, summary(stats, limit))
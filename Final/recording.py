@@ -0,0 +1,89 @@
+import json
+import struct
+import numpy as np
+
+# Binäres Protokoll eines Laufs: Kopf mit Seed und Parametern, danach die
+# Anstöße und der Zustand aller Kugeln nach jedem Schritt. Damit lässt sich
+# ein Lauf neu simulieren (replay.py verify) oder abspielen (replay.py play).
+#
+# Aufbau (little endian):
+#   MAGIC, uint32 Kopflänge, Kopf als JSON (parameters, r, mass)
+#   b"S", uint32 Frame, float64 Geschwindigkeit, float64 Winkel
+#   b"F", uint32 Frame, uint32 Anzahl n, n x (x, y, vx, vy) als float64,
+#         n x uint32 Kugelnummer (ab Version 2, Kugeln können eingelocht werden)
+
+MAGIC = b"BILLARD\x02"
+VERSIONS = (b"BILLARD\x01", MAGIC)
+SHOT = struct.Struct("<Idd")
+FRAME = struct.Struct("<II")
+
+class Recorder:
+    def __init__(self, path, parameters, system):
+        self.file = open(path, "wb")
+        header = json.dumps({
+            "parameters": parameters,
+            "r": system.r.tolist(),
+            "mass": system.mass.tolist(),
+        }).encode("utf-8")
+        self.file.write(MAGIC)
+        self.file.write(struct.pack("<I", len(header)))
+        self.file.write(header)
+
+    def shot(self, frame, speed, angle):
+        # Vor dem Schritt mit dieser Framenummer angewandt
+        self.file.write(b"S" + SHOT.pack(frame, speed, angle))
+
+    def record(self, system):
+        state = np.column_stack((system.x, system.y, system.vx, system.vy))
+        self.file.write(b"F" + FRAME.pack(system.frame, len(state)))
+        self.file.write(state.astype("<f8").tobytes())
+        self.file.write(system.ids.astype("<u4").tobytes())
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_log(path):
+    # Gibt (Kopf, Anstöße, Frames) zurück; Anstöße als Liste von
+    # (frame, speed, angle), Frames als Liste von (frame, Array n x 4,
+    # Kugelnummern). Version 1 hat keine Nummern, dort gilt die Reihenfolge.
+    with open(path, "rb") as f:
+        data = f.read()
+
+    version = data[:len(MAGIC)]
+    if version not in VERSIONS:
+        raise ValueError("%s ist kein Billard-Protokoll" % path)
+    pos = len(MAGIC)
+    (length,) = struct.unpack_from("<I", data, pos)
+    pos += 4
+    header = json.loads(data[pos:pos + length].decode("utf-8"))
+    pos += length
+
+    shots = []
+    frames = []
+    while pos < len(data):
+        kind = data[pos:pos + 1]
+        pos += 1
+        if kind == b"S":
+            shots.append(SHOT.unpack_from(data, pos))
+            pos += SHOT.size
+        elif kind == b"F":
+            frame, n = FRAME.unpack_from(data, pos)
+            pos += FRAME.size
+            state = np.frombuffer(data, dtype="<f8", count=4 * n, offset=pos).reshape(n, 4)
+            pos += state.nbytes
+            if version == MAGIC:
+                ids = np.frombuffer(data, dtype="<u4", count=n, offset=pos).astype(np.int64)
+                pos += 4 * n
+            else:
+                ids = np.arange(n)
+            frames.append((frame, state, ids))
+        else:
+            raise ValueError("Unbekannter Eintrag %r an Position %d" % (kind, pos - 1))
+
+    return header, shots, frames
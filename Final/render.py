@@ -0,0 +1,131 @@
+import numpy as np
+import pygame
+
+# Zeichnen aller Kugeln eines ParticleSystem auf einmal. Statt pro Kugel und
+# Frame pygame.draw.circle aufzurufen, wird jede Kombination aus Radius und
+# Farbstufe einmal vorgerendert und danach nur noch per Surface.blits kopiert.
+# DirtyRenderer zeichnet zusätzlich nur die Bereiche neu, die sich geändert
+# haben, und liefert sie für pygame.display.update.
+
+def speed_levels(system):
+    # Farbwert wie in Particle.draw: rot = min(int(speed * 100), 255)
+    speed = np.sqrt(system.vx * system.vx + system.vy * system.vy)
+    return np.minimum((speed * 100).astype(np.int64), 255), speed
+
+class SpriteCache:
+    # step fasst benachbarte Farbwerte zu einer Stufe zusammen (1 = exakt)
+    def __init__(self, step=8):
+        self.step = step
+        self.sprites = {}
+
+    def color(self, level):
+        level = min(level // self.step * self.step + self.step // 2, 255)
+        return (level, 0, 255 - level)
+
+    def get(self, radius, level):
+        key = (radius, level // self.step)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.sprites[key] = self.render(radius, level)
+        return sprite
+
+    def render(self, radius, level):
+        size = 2 * int(radius)
+        # Schwarz kommt als Kugelfarbe nicht vor (rot + blau = 255)
+        sprite = pygame.Surface((size, size))
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert()
+        sprite.fill((0, 0, 0))
+        pygame.draw.circle(sprite, self.color(level), (int(radius), int(radius)), radius)
+        sprite.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+        return sprite
+
+# Linienfarbe pro Farbwert wie in Particle.draw: (rot, 0, blau)
+LINE_COLORS = np.stack((np.arange(256), np.zeros(256, dtype=np.int64), 255 - np.arange(256)), axis=1)
+
+class Renderer:
+    def __init__(self, cache=None):
+        self.cache = cache or SpriteCache()
+        self.line_colors = LINE_COLORS
+
+    def draw(self, screen, system, lines):
+        levels, speed = speed_levels(system)
+        radii = system.r.tolist()
+        x = system.x.astype(np.int64).tolist()
+        y = system.y.astype(np.int64).tolist()
+        get = self.cache.get
+
+        screen.blits([
+            (get(r, level), (cx - int(r), cy - int(r)))
+            for r, level, cx, cy in zip(radii, levels.tolist(), x, y)
+        ], False)
+
+        if lines == "ja":
+            self.draw_lines(screen, system, levels, speed)
+
+    def draw_lines(self, screen, system, levels, speed):
+        # Richtungslinien wie in Particle.draw; gibt die betroffenen Rechtecke zurück
+        # Endpunkte und Farben für alle Linien auf einmal, danach nur noch
+        # ein Aufruf von pygame.draw.line pro Linie ohne Rechnung in Python
+        moving = np.flatnonzero(speed > 0.2)
+        s = speed[moving]
+        x = system.x[moving]
+        y = system.y[moving]
+        length = s * 30 + system.r[moving]
+        start = zip(x.astype(np.int64).tolist(), y.astype(np.int64).tolist())
+        end = zip((x + length * system.vx[moving] / s).astype(np.int64).tolist(),
+                  (y + length * system.vy[moving] / s).astype(np.int64).tolist())
+        colors = self.line_colors[levels[moving]].tolist()
+        line = pygame.draw.line
+        return [line(screen, color, a, b, 2) for color, a, b in zip(colors, start, end)]
+
+class BallSprite(pygame.sprite.DirtySprite):
+    def __init__(self):
+        pygame.sprite.DirtySprite.__init__(self)
+        self.image = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
+
+class DirtyRenderer(Renderer):
+    # Jede Kugel ist ein DirtySprite in einer LayeredDirty-Gruppe. Nur Kugeln,
+    # deren Bild oder Position sich ändert, werden als dirty markiert; die
+    # Gruppe stellt ihre alten Bereiche aus dem Hintergrund (Tisch und
+    # Taschen) wieder her und zeichnet überlappende Kugeln nach. Ruhende
+    # Kugeln kosten so nichts.
+    def __init__(self, background, cache=None):
+        Renderer.__init__(self, cache)
+        self.background = background
+        self.group = pygame.sprite.LayeredDirty()
+        self.sprites = []
+        self.line_rects = []
+
+    def invalidate(self, rect=None):
+        # Bereich (Standard: alles) im nächsten Frame komplett neu zeichnen,
+        # z.B. nachdem ein Eingabedialog den Bildschirm übermalt hat
+        self.group.repaint_rect(rect or self.background.get_rect())
+
+    def draw(self, screen, system, lines):
+        while len(self.sprites) < len(system):
+            self.sprites.append(BallSprite())
+            self.group.add(self.sprites[-1])
+        while len(self.sprites) > len(system):
+            self.sprites.pop().kill()
+
+        levels, speed = speed_levels(system)
+        get = self.cache.get
+        for sprite, r, level, cx, cy in zip(self.sprites, system.r.tolist(), levels.tolist(),
+                                             system.x.astype(np.int64).tolist(), system.y.astype(np.int64).tolist()):
+            image = get(r, level)
+            left = cx - int(r)
+            top = cy - int(r)
+            if image is not sprite.image or sprite.rect.x != left or sprite.rect.y != top:
+                sprite.image = image
+                sprite.rect = pygame.Rect(left, top, image.get_width(), image.get_height())
+                sprite.dirty = 1
+
+        # Linien des letzten Frames wegräumen lassen
+        for rect in self.line_rects:
+            self.group.repaint_rect(rect)
+        rects = self.group.draw(screen, self.background)
+
+        self.line_rects = self.draw_lines(screen, system, levels, speed) if lines == "ja" else []
+        return rects + self.line_rects
@@ -0,0 +1,104 @@
+import argparse
+import sys
+import time
+import numpy as np
+from particle import Particle
+from recording import read_log
+from headless import build_system, cue_id
+from eventdriven import EventSimulation
+from scenarios import shoot
+from system import FRAME_RATE
+
+# Protokolle aus recording.py auswerten:
+#   python replay.py verify lauf.bin   neu simulieren und Frame für Frame vergleichen
+#   python replay.py play lauf.bin     aufgezeichnete Frames nur abspielen
+
+def resimulate(header, shots, frames):
+    parameters = header["parameters"]
+    system = build_system(parameters)
+    engine = EventSimulation(system) if parameters["engine"] == "event" else system
+    dt = FRAME_RATE / parameters.get("rate", FRAME_RATE)
+
+    pending = {}
+    for frame, speed, angle in shots:
+        pending.setdefault(frame, []).append((speed, angle))
+
+    worst = 0.0
+    first_mismatch = None
+    start = time.perf_counter()
+    for frame, recorded, ids in frames:
+        while system.frame < frame:
+            for speed, angle in pending.pop(system.frame, ()):
+                shoot(system.find(cue_id(parameters)), speed, angle)
+                if engine is not system:
+                    engine.invalidate()
+            engine.step(parameters["width"], parameters["height"], parameters["damping"], dt)
+
+        state = np.column_stack((system.x, system.y, system.vx, system.vy))
+        if state.shape != recorded.shape or not np.array_equal(system.ids, ids):
+            difference = np.inf
+        else:
+            difference = float(np.abs(state - recorded).max()) if len(state) else 0.0
+        if difference > 0 and first_mismatch is None:
+            first_mismatch = frame
+        worst = max(worst, difference)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "frames": len(frames),
+        "seconds": elapsed,
+        "max_difference": worst,
+        "first_mismatch": first_mismatch,
+    }
+
+def play(header, frames, fps, lines):
+    import pygame
+
+    parameters = header["parameters"]
+    radii = header["r"]
+    masses = header["mass"]
+
+    pygame.init()
+    screen = pygame.display.set_mode((parameters["width"], parameters["height"]))
+    pygame.display.set_caption("Billard - Wiedergabe")
+    clock = pygame.time.Clock()
+
+    for frame, state, ids in frames:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return
+
+        screen.fill((0, 0, 0))
+        for (x, y, vx, vy), ball_id in zip(state.tolist(), ids.tolist()):
+            Particle(x, y, radii[ball_id], vx, vy, masses[ball_id]).draw(screen, lines)
+
+        pygame.display.flip()
+        clock.tick(fps)
+
+    pygame.quit()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aufgezeichnete Billard-Läufe prüfen oder abspielen")
+    parser.add_argument("mode", choices=("verify", "play"), help="verify: neu simulieren und vergleichen, play: nur abspielen")
+    parser.add_argument("log", help="Protokolldatei aus --record")
+    parser.add_argument("--fps", type=float, help="Bilder pro Sekunde beim Abspielen (Standard: Physikrate der Aufnahme)")
+    parser.add_argument("--lines", action="store_true", help="Richtungslinien beim Abspielen zeigen")
+    args = parser.parse_args(argv)
+
+    header, shots, frames = read_log(args.log)
+    if args.mode == "play":
+        fps = args.fps or header["parameters"].get("rate", FRAME_RATE)
+        play(header, frames, fps, "ja" if args.lines else "nein")
+        return
+
+    result = resimulate(header, shots, frames)
+    print("Seed %s, %d Frames in %.2f s neu simuliert" % (header["parameters"]["seed"], result["frames"], result["seconds"]))
+    if result["first_mismatch"] is None:
+        print("Identisch mit der Aufzeichnung")
+    else:
+        print("Abweichung ab Frame %d, maximal %g" % (result["first_mismatch"], result["max_difference"]))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
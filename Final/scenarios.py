@@ -0,0 +1,83 @@
+import math
+import random
+from particle import Particle
+from placement import Placement
+
+# Aufbau der Startpositionen, gemeinsam genutzt vom Fenster (main.py) und
+# vom Headless-Runner (headless.py). rng ist das random-Modul oder eine
+# eigene random.Random-Instanz für reproduzierbare Läufe.
+
+def build_rack(canvas_width, canvas_height, radius, mass, use_random_offset, rng=random, jitter=5):
+    # Dreieck aus 15 Kugeln in der Tischmitte plus weiße Kugel als letzte
+    particles = []
+    center_x = canvas_width // 2
+    center_y = canvas_height // 2
+
+    start_x = center_x
+    start_y = center_y
+    num_rows = 5
+    count = 0
+    placement = Placement(int(radius))
+
+    for row in range(num_rows):
+        for col in range(row + 1):
+            while True:
+                offset = int(2 * radius) + (rng.random() * jitter if use_random_offset else 0)
+                x = start_x - col * offset + row * radius
+                y = start_y - row * offset
+                if placement.fits(x, y, int(radius)):
+                    placement.add(x, y, int(radius))
+                    particles.append(Particle(x, y, int(radius), 0, 0, mass))
+                    count += 1
+                    break
+
+            if count >= 15:
+                break
+        if count >= 15:
+            break
+
+    # Benutzerkontrolliertes Partikel
+    particles.append(Particle(center_x, canvas_height - 50, int(radius), 0, 0, mass))
+    return particles
+
+def build_random(canvas_width, canvas_height, count, rng=random):
+    # Zufällig verteilte Kugeln wie in main4.py, weiße Kugel in der Mitte
+    particles = []
+    for _ in range(count):
+        x = rng.randint(20, canvas_width - 20)
+        y = rng.randint(20, canvas_height - 20)
+        r = rng.randint(10, 20)
+        vx = rng.uniform(-2, 2)
+        vy = rng.uniform(-2, 2)
+        mass = rng.uniform(0.5, 2)
+        particles.append(Particle(x, y, r, vx, vy, mass))
+
+    particles.append(Particle(canvas_width / 2, canvas_height / 2, 15, 0, 0, 1))
+    return particles
+
+def shoot(particle, speed, angle):
+    # Winkel in Grad, 90 zeigt auf dem Bildschirm nach oben
+    angle = math.radians(angle)
+    particle.vx = speed * math.cos(angle)
+    particle.vy = -speed * math.sin(angle)
+
+def table_pockets(canvas_width, canvas_height, radius=30):
+    # Vier Ecktaschen wie in main4.py plus zwei Mitteltaschen an den langen Banden
+    pockets = [
+        (radius, radius),
+        (canvas_width - radius, radius),
+        (radius, canvas_height - radius),
+        (canvas_width - radius, canvas_height - radius),
+    ]
+    if canvas_height > canvas_width:
+        pockets += [(radius, canvas_height / 2), (canvas_width - radius, canvas_height / 2)]
+    else:
+        pockets += [(canvas_width / 2, radius), (canvas_width / 2, canvas_height - radius)]
+    return pockets
+
+def respawn_cue(system, ball_id, x, y, r, mass):
+    # Eingelochte weiße Kugel ruhend an (x, y) unter derselben Nummer neu aufstellen
+    def listener(pocketed, pocket, frame):
+        if pocketed == ball_id:
+            system.add(x, y, r, 0, 0, mass, ball_id)
+    system.pocket_listeners.append(listener)
@@ -0,0 +1,413 @@
+import time
+import numpy as np
+from particle import Body, collide
+from broadphase import grid_pairs, all_pairs, SweepAndPrune
+from table import Table
+from kernel import compiled, warm
+
+FIELDS = ("x", "y", "vx", "vy", "r", "mass")
+
+# Geschwindigkeiten sind Pixel pro Frame bei dieser Rate; ein Schritt mit
+# dt = 1 entspricht einem Frame. Höhere Physikraten nutzen dt = FRAME_RATE / Rate.
+FRAME_RATE = 60
+
+# Obergrenze für die Unterteilung eines Schritts (siehe ParticleSystem.substeps)
+MAX_SUBSTEPS = 32
+
+def _field(name):
+    def get(self):
+        return float(getattr(self.system, name)[self.index])
+
+    def set(self, value):
+        getattr(self.system, name)[self.index] = value
+
+    return property(get, set)
+
+class ParticleView(Body):
+    # Dünne Sicht auf eine Kugel im ParticleSystem, damit bestehender Code
+    # (draw, speed, distance, Anstoß der weißen Kugel) unverändert weiterläuft
+    __slots__ = ("system", "index")
+
+    def __init__(self, system, index):
+        self.system = system
+        self.index = index
+
+    x = _field("x")
+    y = _field("y")
+    vx = _field("vx")
+    vy = _field("vy")
+    r = _field("r")
+    mass = _field("mass")
+
+class Snapshot:
+    # Kopie des Zustands zum Zeichnen, unabhängig vom weiterlaufenden System
+    def __init__(self, x, y, vx, vy, r, frame, ids=None):
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.r = r
+        self.frame = frame
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.x)
+
+    def interpolate(self, other, alpha):
+        # Positionen zwischen diesem und einem späteren Zustand (alpha 0..1)
+        # Sind dazwischen Kugeln eingelocht worden, passen die Indizes nicht mehr
+        if len(other) != len(self) or not np.array_equal(self.ids, other.ids):
+            return other
+        return Snapshot(self.x + (other.x - self.x) * alpha, self.y + (other.y - self.y) * alpha,
+                        other.vx, other.vy, other.r, other.frame, other.ids)
+
+class ParticleSystem:
+    # Alle Kugeln als zusammenhängende float64-Arrays (Structure of Arrays).
+    #
+    # Kugeln, die sleep_frames Frames lang langsamer als sleep_speed sind,
+    # werden angehalten und schlafen gelegt. Schlafende Kugeln werden nur noch
+    # gegen wache Kugeln geprüft und wachen bei einem Stoß oder einer von
+    # außen gesetzten Geschwindigkeit wieder auf. sleep_speed = 0 schaltet das ab.
+    #
+    # Jede Kugel hat eine feste Nummer in ids (Startreihenfolge). Eingelochte
+    # Kugeln werden per Swap-Remove entfernt, die Reihenfolge der übrigen
+    # ändert sich dabei; Kugeln also über ids oder find() wiederfinden.
+    #
+    # broadphase wählt die Kandidatensuche: "grid" (Gitter), "sap" (Sweep and
+    # Prune) oder "brute" (alle Paare); ohne Angabe entscheidet use_grid.
+    #
+    # Schnelle Stöße: mit max_travel wird ein Schritt so oft unterteilt, dass
+    # keine Kugel pro Teilschritt weiter als max_travel mal den kleinsten
+    # Radius kommt; langsame Frames bleiben ein einziger Schritt. ccd prüft
+    # zusätzlich Paare, die sich erst im Lauf des Teilschritts berühren
+    # (Swept Circles), und stößt sie zum Berührzeitpunkt. Beides ist
+    # standardmäßig aus, damit ältere Aufzeichnungen gleich bleiben.
+    #
+    # Überlappende Kugeln (z.B. zufällig aufgestellt) werden nach dem Stoß
+    # in separation Durchgängen auseinandergeschoben; 0 schaltet das ab.
+    def __init__(self, particles=(), use_grid=True, sleep_speed=0.05, sleep_frames=30, broadphase=None,
+                 max_travel=None, ccd=False, separation=0):
+        for name in FIELDS:
+            setattr(self, name, np.array([getattr(p, name) for p in particles], dtype=np.float64))
+        self.broadphase = broadphase or ("grid" if use_grid else "brute")
+        self.sweep = SweepAndPrune()
+        # Übersetzte Stoßschleife (siehe kernel.py), None: Python-Schleife
+        self.kernel = compiled
+        warm()
+        self.max_travel = max_travel
+        self.ccd = ccd
+        self.separation = separation
+        self.views = [ParticleView(self, i) for i in range(len(self.x))]
+        self.ids = np.arange(len(self.x), dtype=np.int64)
+        self.next_id = len(self.x)
+
+        self.sleep_speed = sleep_speed
+        self.sleep_frames = sleep_frames
+        self.awake = np.ones(len(self.x), dtype=bool)
+        self.still = np.zeros(len(self.x), dtype=np.float64)
+        self.frame = 0
+        self.contacts = 0
+        # Laufende Summen für profiler.py: Paare aus der Kandidatensuche und
+        # Sekunden in capture()
+        self.candidates = 0
+        self.capture_time = 0.0
+        # Werden mit der Framenummer aufgerufen, sobald alle Kugeln ruhen
+        self.rest_listeners = []
+
+        # Taschen als Mittelpunkte (k x 2); eine Kugel fällt, sobald ihr
+        # Mittelpunkt näher als pocket_radius an einer Tasche liegt
+        self.pockets = np.empty((0, 2), dtype=np.float64)
+        self.pocket_radius = 0.0
+        # Werden mit (Kugelnummer, Tasche, Frame) aufgerufen
+        self.pocket_listeners = []
+        # Banden; ohne eigene Geometrie ein Rechteck in Größe der Zeichenfläche
+        self.table = None
+
+    def __len__(self):
+        return len(self.x)
+
+    @property
+    def particles(self):
+        return self.views
+
+    def add(self, x, y, r, vx, vy, mass, ball_id=None):
+        # ball_id erlaubt es, eine eingelochte Kugel (z.B. die weiße) unter
+        # ihrer alten Nummer wieder aufzustellen
+        if ball_id is None:
+            ball_id = self.next_id
+        self.next_id = max(self.next_id, ball_id + 1)
+        for name, value in zip(FIELDS, (x, y, vx, vy, r, mass)):
+            setattr(self, name, np.append(getattr(self, name), value))
+        self.ids = np.append(self.ids, ball_id)
+        self.awake = np.append(self.awake, True)
+        self.still = np.append(self.still, 0)
+        self.views.append(ParticleView(self, len(self.views)))
+        return self.views[-1]
+
+    def find(self, ball_id):
+        # Sicht auf die Kugel mit dieser Nummer oder None, falls eingelocht
+        index = np.flatnonzero(self.ids == ball_id)
+        return self.views[index[0]] if len(index) else None
+
+    def remove(self, index):
+        # Swap-Remove: die letzte Kugel rückt an die freie Stelle, die Arrays
+        # werden ohne Kopie um eins gekürzt
+        last = len(self) - 1
+        for name in FIELDS + ("ids", "awake", "still"):
+            array = getattr(self, name)
+            array[index] = array[last]
+            setattr(self, name, array[:last])
+        # Die Sicht der entfernten Kugel zeigt danach ins Leere
+        self.views[index].index = None
+        view = self.views.pop()
+        if index != last:
+            view.index = index
+            self.views[index] = view
+
+    def pairs(self, r=None):
+        # r: Radien für die Suche, z.B. um den Weg im Schritt vergrößert
+        r = self.r if r is None else r
+        if self.broadphase == "grid":
+            return grid_pairs(self.x, self.y, r)
+        if self.broadphase == "sap":
+            return self.sweep.pairs(self.x, self.y, r)
+        return all_pairs(len(self))
+
+    def snapshot(self):
+        return Snapshot(self.x.copy(), self.y.copy(), self.vx.copy(), self.vy.copy(), self.r.copy(), self.frame,
+                        self.ids.copy())
+
+    @property
+    def at_rest(self):
+        return not self.awake.any()
+
+    def nearby(self, reach):
+        # Paare, deren Kreise mit Radius reach sich überlappen, sortiert nach
+        # (first, second). Die Kandidatensuche liefert je nach Verfahren
+        # unterschiedlich viele überzählige Paare; nach dem Filtern ist das
+        # Ergebnis für Gitter, Sweep and Prune und Brute-Force dasselbe.
+        first, second = self.pairs(reach)
+        # Zwei schlafende Kugeln können sich nicht stoßen
+        active = self.awake[first] | self.awake[second]
+        first = first[active]
+        second = second[active]
+        self.candidates += len(first)
+        dx = self.x[first] - self.x[second]
+        dy = self.y[first] - self.y[second]
+        near = np.sqrt(dx * dx + dy * dy) < reach[first] + reach[second]
+        first = first[near]
+        second = second[near]
+        order = np.lexsort((second, first))
+        return first[order], second[order]
+
+    def collide(self, dt=1.0):
+        first, second = self.nearby(self.r)
+        if len(first):
+            self.resolve(first, second)
+        if self.ccd:
+            # Erst nach den Stößen suchen, was sich innerhalb von dt erreicht:
+            # eine gerade angestoßene Kugel kommt weiter als vorher
+            first, second = self.nearby(self.r + np.sqrt(self.vx * self.vx + self.vy * self.vy) * dt)
+            if len(first):
+                self.collide_swept(first, second, dt)
+        if self.separation and len(first):
+            self.separate(first, second)
+
+    def resolve(self, first, second):
+        # Stöße in derselben Reihenfolge wie Particle.update auflösen, da eine
+        # Kugel an mehreren Kontakten beteiligt sein kann
+        order = np.lexsort((second, first))
+        if self.kernel is not None:
+            self.contacts += self.kernel(first[order], second[order], self.x, self.y, self.vx, self.vy,
+                                         self.mass, self.awake, self.still)
+            return
+
+        x = self.x.tolist()
+        y = self.y.tolist()
+        vx = self.vx.tolist()
+        vy = self.vy.tolist()
+        mass = self.mass.tolist()
+        for i, j in zip(first[order].tolist(), second[order].tolist()):
+            result = collide(x[i], y[i], vx[i], vy[i], mass[i], x[j], y[j], vx[j], vy[j], mass[j])
+            if result is not None:
+                vx[i], vy[i], vx[j], vy[j] = result
+                self.contacts += 1
+                self.awake[i] = self.awake[j] = True
+                self.still[i] = self.still[j] = 0
+
+        self.vx[:] = vx
+        self.vy[:] = vy
+
+    def collide_swept(self, first, second, dt):
+        # Paare, die sich jetzt nicht berühren, aber innerhalb von dt: Zeit
+        # der Berührung aus |d + w t| = r_i + r_j (wie in eventdriven.py);
+        # für schon überlappende Paare ist t negativ
+        dx = self.x[second] - self.x[first]
+        dy = self.y[second] - self.y[first]
+        wx = self.vx[second] - self.vx[first]
+        wy = self.vy[second] - self.vy[first]
+        sigma = self.r[first] + self.r[second]
+        a = wx * wx + wy * wy
+        b = dx * wx + dy * wy
+        d = b * b - a * (dx * dx + dy * dy - sigma * sigma)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = -(b + np.sqrt(d)) / a
+        hit = (b < 0) & (d >= 0) & (a > 0) & (t >= 0) & (t <= dt)
+        if not hit.any():
+            return
+
+        # Früheste Berührung zuerst; jede Kugel höchstens einmal pro
+        # Teilschritt, spätere Berührungen folgen im nächsten
+        order = np.argsort(t[hit], kind="stable")
+        pairs = zip(first[hit][order].tolist(), second[hit][order].tolist(), t[hit][order].tolist())
+        x, y, vx, vy, mass = self.x, self.y, self.vx, self.vy, self.mass
+        used = set()
+        for i, j, t in pairs:
+            if i in used or j in used:
+                continue
+            result = collide(x[i] + vx[i] * t, y[i] + vy[i] * t, vx[i], vy[i], mass[i],
+                             x[j] + vx[j] * t, y[j] + vy[j] * t, vx[j], vy[j], mass[j])
+            if result is None:
+                continue
+            # Position so verschieben, dass die Kugel nach x += v * dt dort
+            # steht, wo sie bis t mit der alten und danach mit der neuen
+            # Geschwindigkeit hinkommt
+            x[i] += (vx[i] - result[0]) * t
+            y[i] += (vy[i] - result[1]) * t
+            x[j] += (vx[j] - result[2]) * t
+            y[j] += (vy[j] - result[3]) * t
+            vx[i], vy[i], vx[j], vy[j] = result
+            used.update((i, j))
+            self.contacts += 1
+            self.awake[i] = self.awake[j] = True
+            self.still[i] = self.still[j] = 0
+
+    def separate(self, first, second):
+        # Überlappende Paare aus der Kandidatensuche auseinanderschieben, die
+        # leichtere Kugel weiter. Mehrere Durchgänge, weil das Trennen eines
+        # Paars in dichten Haufen ein anderes wieder überlappen lässt.
+        inverse = 1 / self.mass
+        x, y = self.x, self.y
+        for _ in range(self.separation):
+            nx = x[second] - x[first]
+            ny = y[second] - y[first]
+            distance = np.sqrt(nx * nx + ny * ny)
+            depth = self.r[first] + self.r[second] - distance
+            hit = depth > 0
+            if not hit.any():
+                return
+
+            i, j = first[hit], second[hit]
+            nx, ny, distance, depth = nx[hit], ny[hit], distance[hit], depth[hit]
+            # Genau übereinander: in x-Richtung trennen
+            same = distance == 0
+            nx[same] = 1.0
+            distance[same] = 1.0
+            share = depth / (distance * (inverse[i] + inverse[j]))
+            np.subtract.at(x, i, nx * share * inverse[i])
+            np.subtract.at(y, i, ny * share * inverse[i])
+            np.add.at(x, j, nx * share * inverse[j])
+            np.add.at(y, j, ny * share * inverse[j])
+            self.awake[i] = self.awake[j] = True
+            self.still[i] = self.still[j] = 0
+
+    def substeps(self, dt):
+        # Anzahl der Teilschritte, damit keine wache Kugel pro Teilschritt
+        # weiter als max_travel mal den kleinsten Radius kommt
+        if not self.max_travel or len(self) == 0:
+            return 1
+        speed2 = (self.vx * self.vx + self.vy * self.vy)[self.awake]
+        if len(speed2) == 0:
+            return 1
+        travel = np.sqrt(speed2.max()) * dt / (self.max_travel * self.r.min())
+        return min(max(int(np.ceil(travel)), 1), MAX_SUBSTEPS)
+
+    def settle(self, dt=1.0):
+        # Ruhezähler fortschreiben und lange langsame Kugeln schlafen legen.
+        # Gibt True zurück, wenn dabei Kugeln angehalten wurden.
+        was_awake = self.awake.any()
+        slow = self.vx * self.vx + self.vy * self.vy < self.sleep_speed * self.sleep_speed
+        self.still = np.where(slow, self.still + dt, 0)
+
+        falling = self.awake & (self.still >= self.sleep_frames)
+        stopped = bool(falling.any())
+        if stopped:
+            self.awake[falling] = False
+            self.vx[falling] = 0
+            self.vy[falling] = 0
+
+        self.frame += 1
+        if was_awake and self.at_rest:
+            for listener in self.rest_listeners:
+                listener(self.frame)
+        return stopped
+
+    def capture(self):
+        # Abstand aller Kugeln zu allen Taschen auf einmal; eingelochte Kugeln
+        # entfernen und danach melden. Gibt die Ereignisse als Liste von
+        # (Kugelnummer, Tasche) zurück.
+        if len(self.pockets) == 0 or len(self) == 0:
+            return []
+        dx = self.x[:, None] - self.pockets[:, 0]
+        dy = self.y[:, None] - self.pockets[:, 1]
+        inside = dx * dx + dy * dy < self.pocket_radius * self.pocket_radius
+        fallen = np.flatnonzero(inside.any(axis=1))
+        if len(fallen) == 0:
+            return []
+
+        events = list(zip(self.ids[fallen].tolist(), inside[fallen].argmax(axis=1).tolist()))
+        # Von hinten entfernen, damit die noch offenen Indizes gültig bleiben
+        for index in fallen[::-1].tolist():
+            self.remove(index)
+        for ball_id, pocket in events:
+            for listener in self.pocket_listeners:
+                listener(ball_id, pocket, self.frame)
+        return events
+
+    def boundary(self, canvas_width, canvas_height):
+        if self.table is None or self.table.size != (canvas_width, canvas_height):
+            self.table = Table.rectangle(canvas_width, canvas_height)
+        return self.table
+
+    def wake(self):
+        # Von außen angestoßene Kugeln (z.B. weiße Kugel) wieder aufwecken
+        pushed = ~self.awake & ((self.vx != 0) | (self.vy != 0))
+        self.awake[pushed] = True
+        self.still[pushed] = 0
+
+    def step(self, canvas_width, canvas_height, damping_factor, dt=1.0):
+        # dt in Frames; die Dämpfung gilt pro Frame und wird entsprechend skaliert
+        self.wake()
+        if self.at_rest:
+            self.frame += 1
+            return
+
+        substeps = self.substeps(dt)
+        h = dt / substeps
+        while substeps:
+            self.advance(canvas_width, canvas_height, damping_factor, h)
+            substeps -= 1
+            # Ein Stoß kann eine Kugel beschleunigen; dann den Rest feiner teilen
+            needed = self.substeps(h * substeps) if substeps else 0
+            if needed > substeps:
+                h *= substeps / needed
+                substeps = needed
+        self.settle(dt)
+
+    def advance(self, canvas_width, canvas_height, damping_factor, dt):
+        # Ein (Teil-)Schritt ohne Ruhezähler und Framenummer
+        self.collide(dt)
+
+        x, y, vx, vy, r = self.x, self.y, self.vx, self.vy, self.r
+        self.boundary(canvas_width, canvas_height).collide(x, y, vx, vy, r)
+
+        damping = damping_factor ** dt
+        vx *= damping
+        vy *= damping
+
+        x += vx * dt
+        y += vy * dt
+
+        started = time.perf_counter()
+        self.capture()
+        self.capture_time += time.perf_counter() - started
@@ -0,0 +1,242 @@
+import math
+import numpy as np
+
+# Tischgeometrie aus Strecken: Banden und Taschenbacken. Jede Strecke hat
+# eine Normale, die zur Spielfläche zeigt. Liegt der Fußpunkt einer Kugel
+# auf der Strecke, zählt der vorzeichenbehaftete Abstand (Kugeln, die durch
+# die Bande geschossen sind, werden zurückgeholt); an den Enden wird die
+# Strecke wie ein Punkt behandelt, so prallen Kugeln sauber von den Backen ab.
+#
+# Die Strecken liegen in einem festen Gitter. Jede Zelle kennt die Strecken,
+# die einer Kugel mit Mittelpunkt in dieser Zelle nahe kommen können; eine
+# Kugel in der Tischmitte prüft so gar keine Strecke.
+
+# Höchstzahl der Durchgänge, falls eine Kugel mehrere Strecken berührt (Ecke)
+ROUNDS = 4
+
+def segment(a, b, toward):
+    # Strecke von a nach b mit Normale auf der Seite des Punkts toward
+    dx = b[0] - a[0]
+    dy = b[1] - a[1]
+    length = math.hypot(dx, dy)
+    nx, ny = -dy / length, dx / length
+    if (toward[0] - a[0]) * nx + (toward[1] - a[1]) * ny < 0:
+        nx, ny = -nx, -ny
+    return (a[0], a[1], b[0], b[1], nx, ny)
+
+class Table:
+    def __init__(self, width, height, segments, cell_size=64):
+        self.size = (width, height)
+        data = np.array(segments, dtype=np.float64).reshape(-1, 6)
+        self.ax, self.ay, bx, by, self.nx, self.ny = data.T
+        self.dx = bx - self.ax
+        self.dy = by - self.ay
+        self.length2 = self.dx * self.dx + self.dy * self.dy
+        self.cell_size = cell_size
+        self.columns = int(width // cell_size) + 1
+        self.rows = int(height // cell_size) + 1
+        self.reach = None
+
+    def __len__(self):
+        return len(self.ax)
+
+    @classmethod
+    def rectangle(cls, width, height):
+        # Vier Banden am Rand wie bisher. Sie reichen über die Ecken hinaus,
+        # damit auch weit hinausgeschossene Kugeln zurückgeholt werden.
+        far = width + height
+        center = (width / 2, height / 2)
+        return cls(width, height, [
+            segment((-far, 0), (width + far, 0), center),
+            segment((-far, height), (width + far, height), center),
+            segment((0, -far), (0, height + far), center),
+            segment((width, -far), (width, height + far), center),
+        ])
+
+    @classmethod
+    def with_pockets(cls, width, height, pockets, radius):
+        # Banden mit Aussparungen an den Taschen (Mittelpunkte wie in
+        # scenarios.table_pockets). Jede Aussparung wird von zwei Backen zu
+        # einem Punkt hinter der Bande geschlossen, damit keine Kugel, die
+        # am Fangkreis vorbeirutscht, den Tisch verlässt.
+        center = (width / 2, height / 2)
+        rails = (
+            ((0, 0), (width, 0), (0, 1)),
+            ((0, height), (width, height), (0, -1)),
+            ((0, 0), (0, height), (1, 0)),
+            ((width, 0), (width, height), (-1, 0)),
+        )
+        segments = []
+        jaws = []
+        for (ax, ay), (bx, by), normal in rails:
+            length = math.hypot(bx - ax, by - ay)
+            ux, uy = (bx - ax) / length, (by - ay) / length
+            # Aussparungen als Intervalle entlang der Bande
+            cuts = []
+            for px, py in pockets:
+                if abs((px - ax) * normal[0] + (py - ay) * normal[1]) < 2 * radius:
+                    along = (px - ax) * ux + (py - ay) * uy
+                    cuts.append((max(along - radius, 0), min(along + radius, length)))
+            cuts.sort()
+            start = 0
+            for cut_start, cut_end in cuts + [(length, length)]:
+                if cut_start > start:
+                    segments.append(segment((ax + ux * start, ay + uy * start), (ax + ux * cut_start, ay + uy * cut_start), center))
+                start = max(start, cut_end)
+            for cut_start, cut_end in cuts:
+                for along in (cut_start, cut_end):
+                    if 0 < along < length:
+                        jaws.append(((ax + ux * along, ay + uy * along), normal))
+
+        for px, py in pockets:
+            # Hinter der Tasche liegt der Punkt, an dem sich die Backen treffen
+            near = [(end, normal) for end, normal in jaws if math.hypot(end[0] - px, end[1] - py) <= 2 * radius]
+            back_x = px - 2 * radius * sum(n[0] for n in {normal for _, normal in near})
+            back_y = py - 2 * radius * sum(n[1] for n in {normal for _, normal in near})
+            for end, _ in near:
+                segments.append(segment(end, (back_x, back_y), (px, py)))
+
+        return cls(width, height, segments)
+
+    def build(self, reach):
+        # Zellen -> Strecken, die näher als reach (größter Radius) an die
+        # Zelle herankommen. Als CSR: items[start[c]:start[c + 1]]
+        self.reach = reach
+        size = self.cell_size
+        cells = []
+        for k in range(len(self)):
+            x0 = min(self.ax[k], self.ax[k] + self.dx[k]) - reach
+            x1 = max(self.ax[k], self.ax[k] + self.dx[k]) + reach
+            y0 = min(self.ay[k], self.ay[k] + self.dy[k]) - reach
+            y1 = max(self.ay[k], self.ay[k] + self.dy[k]) + reach
+            # Außerhalb des Tischs liegende Kugeln landen in den Randzellen
+            c0 = min(max(int(x0 // size), 0), self.columns - 1)
+            c1 = min(max(int(x1 // size), 0), self.columns - 1)
+            r0 = min(max(int(y0 // size), 0), self.rows - 1)
+            r1 = min(max(int(y1 // size), 0), self.rows - 1)
+            for row in range(r0, r1 + 1):
+                for column in range(c0, c1 + 1):
+                    cells.append((row * self.columns + column, k))
+
+        cells.sort()
+        keys = np.array([cell for cell, _ in cells], dtype=np.int64)
+        self.items = np.array([k for _, k in cells], dtype=np.int64)
+        self.start = np.searchsorted(keys, np.arange(self.columns * self.rows + 1))
+        self.counts = np.diff(self.start)
+
+    def candidates(self, x, y, r):
+        # Paare (Kugel, Strecke) aus der Zelle jeder Kugel
+        if len(x) == 0 or len(self) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        reach = r.max()
+        if self.reach is None or reach > self.reach:
+            self.build(reach)
+
+        # Abschneiden statt floor genügt, negative Werte landen ohnehin in Zelle 0
+        scale = 1 / self.cell_size
+        column = np.clip((x * scale).astype(np.int64), 0, self.columns - 1)
+        row = np.clip((y * scale).astype(np.int64), 0, self.rows - 1)
+        cell = row * self.columns + column
+        # Meist liegt nur ein kleiner Teil der Kugeln in Zellen mit Strecken
+        balls = np.flatnonzero(self.counts[cell])
+        cell = cell[balls]
+        start = self.start[cell]
+        count = self.counts[cell]
+
+        balls = np.repeat(balls, count)
+        within = np.arange(len(balls)) - np.repeat(np.cumsum(count) - count, count)
+        return balls, self.items[np.repeat(start, count) + within]
+
+    def contact(self, x, y, k):
+        # Abstand der Punkte (x, y) zu den Strecken k und Richtung, in die
+        # sie herausgeschoben werden müssen
+        px = x - self.ax[k]
+        py = y - self.ay[k]
+        t = (px * self.dx[k] + py * self.dy[k]) / self.length2[k]
+        face = (t >= 0) & (t <= 1)
+        t = np.clip(t, 0, 1)
+        qx = px - t * self.dx[k]
+        qy = py - t * self.dy[k]
+        end = np.sqrt(qx * qx + qy * qy)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            nx = np.where(face, self.nx[k], qx / end)
+            ny = np.where(face, self.ny[k], qy / end)
+        distance = np.where(face, px * self.nx[k] + py * self.ny[k], end)
+        # Mittelpunkt genau auf einem Ende: keine Richtung
+        valid = face | (end > 0)
+        return distance, nx, ny, valid
+
+    def collide(self, x, y, vx, vy, r):
+        # Kugeln aus den Strecken herausschieben und zurückwerfen, wenn sie
+        # auf die Strecke zulaufen; die Arrays werden direkt geändert.
+        # Pro Durchgang zählt für jede Kugel nur die tiefste Berührung.
+        balls, k = self.candidates(x, y, r)
+        for _ in range(ROUNDS):
+            if len(balls) == 0:
+                return
+            distance, nx, ny, valid = self.contact(x[balls], y[balls], k)
+            depth = r[balls] - distance
+            approach = vx[balls] * nx + vy[balls] * ny
+            hit = valid & (depth >= 0) & ((depth > 0) | (approach < 0))
+            if not hit.any():
+                return
+
+            balls, k = balls[hit], k[hit]
+            depth, nx, ny, approach = depth[hit], nx[hit], ny[hit], approach[hit]
+            order = np.lexsort((-depth, balls))
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = balls[order][1:] != balls[order][:-1]
+            pick = order[first]
+
+            b = balls[pick]
+            x[b] += depth[pick] * nx[pick]
+            y[b] += depth[pick] * ny[pick]
+            bounce = np.minimum(approach[pick], 0)
+            vx[b] -= 2 * bounce * nx[pick]
+            vy[b] -= 2 * bounce * ny[pick]
+
+            # Im nächsten Durchgang nur Kugeln, die gerade eine Strecke berührt haben
+            again = np.isin(balls, b)
+            balls, k = balls[again], k[again]
+
+    def impact_times(self, x, y, vx, vy, r):
+        # Zeit bis zur Berührung jeder Strecke für eine Kugel (inf: nie), für
+        # die ereignisgesteuerte Simulation
+        px = x - self.ax
+        py = y - self.ay
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Fläche: Abstand zur Geraden erreicht r, Fußpunkt auf der Strecke
+            approach = vx * self.nx + vy * self.ny
+            offset = px * self.nx + py * self.ny
+            face = np.where(offset <= r, 0.0, (r - offset) / approach)
+            t = ((px + vx * face) * self.dx + (py + vy * face) * self.dy) / self.length2
+            face = np.where((approach < 0) & (t >= 0) & (t <= 1), face, np.inf)
+
+            # Enden: wie ein Stoß mit einer Kugel vom Radius 0
+            speed2 = vx * vx + vy * vy
+            times = [face]
+            for ex, ey in ((px, py), (px - self.dx, py - self.dy)):
+                b = ex * vx + ey * vy
+                c = ex * ex + ey * ey - r * r
+                d = b * b - speed2 * c
+                hit = np.where(c < 0, 0.0, -(b + np.sqrt(d)) / speed2)
+                times.append(np.where((b < 0) & (d >= 0) & (speed2 > 0), hit, np.inf))
+        return np.minimum.reduce(times)
+
+    def bounce(self, x, y, vx, vy, r, i, k):
+        # Einzelner Aufprall von Kugel i auf Strecke k; True, wenn sie
+        # zurückgeworfen wurde
+        distance, nx, ny, valid = self.contact(x[i:i + 1], y[i:i + 1], np.array([k]))
+        if not valid[0]:
+            return False
+        nx, ny = float(nx[0]), float(ny[0])
+        depth = r[i] - float(distance[0])
+        if depth > 0:
+            x[i] += depth * nx
+            y[i] += depth * ny
+        approach = vx[i] * nx + vy[i] * ny
+        if approach >= 0:
+            return False
+        vx[i] -= 2 * approach * nx
+        vy[i] -= 2 * approach * ny
+        return True
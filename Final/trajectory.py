@@ -0,0 +1,91 @@
+import json
+import os
+import struct
+import numpy as np
+
+# Kompakte Trajektorien langer Läufe: feste Framebreite aus float32
+# (x, y, vx, vy pro Kugel), damit sich die Datei per memmap lesen und
+# nach Frames und Kugeln schneiden lässt, ohne sie ganz zu laden.
+#
+# Aufbau (little endian):
+#   MAGIC, uint32 Kugelanzahl, uint32 Datenbeginn, Metadaten als JSON,
+#   Auffüllung bis Datenbeginn (Vielfaches von 16), danach die Frames
+#   als float32[Frames, Kugeln, 4]
+#
+# Die Kugeln stehen nach ihrer Nummer (ParticleSystem.ids) in der Datei;
+# eingelochte Kugeln sind in den folgenden Frames NaN.
+
+MAGIC = b"BILLTRJ\x01"
+FIELDS = ("x", "y", "vx", "vy")
+DTYPE = np.dtype("<f4")
+
+class TrajectoryWriter:
+    def __init__(self, path, balls, metadata=None):
+        self.balls = balls
+        self.file = open(path, "wb")
+        meta = json.dumps(metadata or {}).encode("utf-8")
+        start = len(MAGIC) + 8 + len(meta)
+        start += -start % 16
+        self.file.write(MAGIC)
+        self.file.write(struct.pack("<II", balls, start))
+        self.file.write(meta)
+        self.file.write(b"\0" * (start - self.file.tell()))
+
+    def write(self, system):
+        frame = np.full((self.balls, len(FIELDS)), np.nan, dtype=DTYPE)
+        known = system.ids < self.balls
+        ids = system.ids[known]
+        for column, name in enumerate(FIELDS):
+            frame[ids, column] = getattr(system, name)[known]
+        self.file.write(frame.tobytes())
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class Trajectory:
+    # Liest eine Trajektorie als memmap; frames[f, i] ist (x, y, vx, vy)
+    # von Kugel i in Frame f. Ein unvollständiger letzter Frame (z.B. nach
+    # einem Abbruch) wird ignoriert.
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            head = f.read(len(MAGIC) + 8)
+            if head[:len(MAGIC)] != MAGIC:
+                raise ValueError("%s ist keine Billard-Trajektorie" % path)
+            self.balls, start = struct.unpack_from("<II", head, len(MAGIC))
+            self.metadata = json.loads(f.read(start - len(head)).rstrip(b"\0").decode("utf-8"))
+
+        frame_size = self.balls * len(FIELDS) * DTYPE.itemsize
+        count = (os.path.getsize(path) - start) // frame_size if frame_size else 0
+        if count:
+            self.frames = np.memmap(path, dtype=DTYPE, mode="r", offset=start, shape=(count, self.balls, len(FIELDS)))
+        else:
+            self.frames = np.empty((0, self.balls, len(FIELDS)), dtype=DTYPE)
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def x(self):
+        return self.frames[:, :, 0]
+
+    @property
+    def y(self):
+        return self.frames[:, :, 1]
+
+    @property
+    def vx(self):
+        return self.frames[:, :, 2]
+
+    @property
+    def vy(self):
+        return self.frames[:, :, 3]
+
+    def ball(self, index):
+        # Verlauf einer einzelnen Kugel als Array [Frames, 4]
+        return self.frames[:, index]